@@ -9,13 +9,19 @@ import subprocess
 import sys
 import tempfile
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
+_ROOT_PREFIX = str(ROOT_DIR).rstrip("/") + "/"
 
 READY_CHECK_URL = "http://localhost:8080/auth/me"
 
@@ -48,6 +54,15 @@ def utc_compact_timestamp(dt: datetime) -> str:
     return dt.strftime("%Y%m%dT%H%M%SZ")
 
 
+def utc_iso_timestamp(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def root_relative(path: Path) -> str:
+    # Paths under ROOT_DIR are built from it, so a prefix strip matches `relative_to`.
+    return str(path).removeprefix(_ROOT_PREFIX)
+
+
 def mask_secret(value: str | None, keep: int = 8) -> str:
     s = value or ""
     n = len(s)
@@ -168,6 +183,18 @@ class CurlRawResult:
     body_text: str
 
 
+def json_dumps_compact(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+def json_loads(text: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 def run_cmd(cmd: list[str], *, timeout_s: int = 30) -> subprocess.CompletedProcess[str]:
     return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s)
 
@@ -210,7 +237,7 @@ def curl_json(
         if bearer:
             cmd += ["-H", f"Authorization: Bearer {bearer}"]
         if json_body is not None:
-            cmd += ["-H", "Content-Type: application/json", "--data", json.dumps(json_body)]
+            cmd += ["-H", "Content-Type: application/json", "--data", json_dumps_compact(json_body)]
 
         proc = run_cmd(cmd, timeout_s=timeout_s)
         body_text = Path(tmp_path).read_text(encoding="utf-8", errors="replace")
@@ -221,7 +248,7 @@ def curl_json(
         body_json: Any | None = None
         try:
             if body_text.strip():
-                body_json = json.loads(body_text)
+                body_json = json_loads(body_text)
         except Exception:
             body_json = None
         return CurlResult(status_code=status_code, body_text=body_text, body_json=body_json)
@@ -284,7 +311,7 @@ def curl_raw(
             for k, v in extra_headers.items():
                 cmd += ["-H", f"{k}: {v}"]
         if json_body is not None:
-            cmd += ["-H", "Content-Type: application/json", "--data", json.dumps(json_body)]
+            cmd += ["-H", "Content-Type: application/json", "--data", json_dumps_compact(json_body)]
 
         proc = run_cmd(cmd, timeout_s=timeout_s + 5)
         if proc.returncode != 0:
@@ -379,12 +406,9 @@ def append_workflow_record(*, report_path: Path, pass_count: int, fail_count: in
     doc_path = ROOT_DIR / "workflow_follow.md"
     if not doc_path.exists():
         return
-    stamp = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    stamp = utc_iso_timestamp(utc_now())
     status = "Pass" if fail_count == 0 else "Fail"
-    try:
-        report_display = report_path.relative_to(ROOT_DIR).as_posix()
-    except Exception:
-        report_display = report_path.as_posix()
+    report_display = root_relative(report_path)
 
     heading = "#### 接口测试记录（业务语义 biz）"
     record = (
@@ -436,7 +460,17 @@ def append_workflow_record(*, report_path: Path, pass_count: int, fail_count: in
     doc_path.write_text("".join(lines), encoding="utf-8")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class RequestSpec:
+    # Kept unrendered; render_request formats the auth/body preview only when it is shown.
+    method: str
+    path: str
+    auth_label: str | None = None
+    auth_secret: str | None = field(default=None, repr=False)
+    json_body: dict[str, Any] | None = None
+
+
+@dataclass(frozen=True, slots=True)
 class CaseResult:
     suite: str
     name: str
@@ -445,7 +479,7 @@ class CaseResult:
     expected: str
     actual: int
     passed: bool
-    request: str
+    request: RequestSpec | str
     response: str
 
 
@@ -468,6 +502,21 @@ def fmt_request(
     return " | ".join(parts)
 
 
+def render_request(request: RequestSpec | str, *, full: bool) -> str:
+    # Full previews (auth + body) are only rendered for failing cases.
+    if isinstance(request, str):
+        return request
+    if not full:
+        return f"{request.method} {request.path}"
+    return fmt_request(
+        method=request.method,
+        path=request.path,
+        auth_label=request.auth_label,
+        auth_secret=request.auth_secret,
+        json_body=request.json_body,
+    )
+
+
 def parse_models_ids(body_json: Any) -> list[str]:
     if not ensure_models_shape(body_json):
         return []
@@ -559,7 +608,7 @@ def main() -> int:
         return 2
 
     log("== Gateway Zero business semantic tests (biz2: upstream + constraints + observability) ==")
-    log(f"time_utc: {run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}")
+    log(f"time_utc: {utc_iso_timestamp(run_dt)}")
     log(f"git_sha : {git_sha_short()}")
     log(f"base_url: {base_url}")
     log(f"ready_check(required): curl {READY_CHECK_URL}")
@@ -632,6 +681,8 @@ def main() -> int:
 
     results: list[CaseResult] = []
     failures: list[CaseResult] = []
+    pass_count = 0
+    fail_count = 0
 
     def record(
         *,
@@ -642,25 +693,29 @@ def main() -> int:
         expected: str,
         actual: int,
         passed: bool,
-        request: str,
+        request: RequestSpec | str,
         response: str,
     ) -> None:
+        nonlocal pass_count, fail_count
         r = CaseResult(
-            suite=suite,
+            suite=sys.intern(suite),
             name=name,
-            method=method,
-            path=path,
-            expected=expected,
+            method=sys.intern(method),
+            path=sys.intern(path),
+            expected=sys.intern(expected),
             actual=actual,
             passed=passed,
             request=request,
             response=response,
         )
         results.append(r)
-        if not passed:
+        if passed:
+            pass_count += 1
+        else:
+            fail_count += 1
             failures.append(r)
         log(
-            f"case suite={suite} name={name} req={request} exp={expected} act={actual} ok={passed} resp={response or '(empty)'}"
+            f"case suite={suite} name={name} req={render_request(request, full=not passed)} exp={expected} act={actual} ok={passed} resp={response or '(empty)'}"
         )
 
     prefix = f"biz2_{run_stamp}_{run_rand}"
@@ -804,7 +859,7 @@ def main() -> int:
         # --- A. ClientToken business effect ---
         suite = "P1.A.ClientToken"
 
-        req = fmt_request(
+        req = RequestSpec(
             method="POST",
             path="/admin/tokens",
             auth_label="superadmin",
@@ -843,7 +898,7 @@ def main() -> int:
         assert created_client_token is not None
         assert created_token_id is not None
 
-        req = fmt_request(
+        req = RequestSpec(
             method="GET",
             path="/v1/models",
             auth_label="client_token",
@@ -870,7 +925,7 @@ def main() -> int:
             response=response_snippet(r.body_text) or "",
         )
 
-        req = fmt_request(
+        req = RequestSpec(
             method="POST",
             path=f"/admin/tokens/{created_token_id}/toggle",
             auth_label="superadmin",
@@ -897,7 +952,7 @@ def main() -> int:
             response=response_snippet(r.body_text) or "",
         )
 
-        req = fmt_request(method="GET", path="/v1/models", auth_label="client_token", auth_secret=created_client_token)
+        req = RequestSpec(method="GET", path="/v1/models", auth_label="client_token", auth_secret=created_client_token)
         r = curl_json(base_url=base_url, method="GET", path="/v1/models", bearer=created_client_token, timeout_s=30)
         expected_reject = r.status_code if r.status_code in (401, 403) else 401
         ok = r.status_code in (401, 403) and ensure_error_shape(r.body_json)
@@ -913,7 +968,7 @@ def main() -> int:
             response=response_snippet(r.body_text) or "",
         )
 
-        req = fmt_request(
+        req = RequestSpec(
             method="POST",
             path=f"/admin/tokens/{created_token_id}/toggle",
             auth_label="superadmin",
@@ -940,7 +995,7 @@ def main() -> int:
             response=response_snippet(r.body_text) or "",
         )
 
-        req = fmt_request(method="GET", path="/v1/models", auth_label="client_token", auth_secret=created_client_token)
+        req = RequestSpec(method="GET", path="/v1/models", auth_label="client_token", auth_secret=created_client_token)
         r = curl_json(base_url=base_url, method="GET", path="/v1/models", bearer=created_client_token, timeout_s=30)
         ok = r.status_code == 200 and ensure_models_shape(r.body_json)
         record(
@@ -955,7 +1010,7 @@ def main() -> int:
             response=response_snippet(r.body_text) or "",
         )
 
-        req = fmt_request(method="DELETE", path=f"/admin/tokens/{created_token_id}", auth_label="superadmin", auth_secret=access_token)
+        req = RequestSpec(method="DELETE", path=f"/admin/tokens/{created_token_id}", auth_label="superadmin", auth_secret=access_token)
         r = curl_json(base_url=base_url, method="DELETE", path=f"/admin/tokens/{created_token_id}", bearer=access_token, timeout_s=30)
         record(
             suite=suite,
@@ -969,7 +1024,7 @@ def main() -> int:
             response=response_snippet(r.body_text) or "",
         )
 
-        req = fmt_request(method="GET", path="/v1/models", auth_label="client_token", auth_secret=created_client_token)
+        req = RequestSpec(method="GET", path="/v1/models", auth_label="client_token", auth_secret=created_client_token)
         r = curl_json(base_url=base_url, method="GET", path="/v1/models", bearer=created_client_token, timeout_s=30)
         ok = r.status_code in (401, 403) and ensure_error_shape(r.body_json) and (r.status_code == expected_reject)
         record(
@@ -989,7 +1044,7 @@ def main() -> int:
         # --- B. Providers/keys business effect (upstream-dependent, no billing) ---
         suite = "P1.B.ProvidersKeys"
 
-        req = fmt_request(
+        req = RequestSpec(
             method="POST",
             path="/providers",
             auth_label="superadmin",
@@ -1020,7 +1075,7 @@ def main() -> int:
             raise RuntimeError("provider fixture create failed; aborting downstream B cases")
 
         upstream_path = f"/models/{provider_name}?refresh=true"
-        req = fmt_request(method="GET", path=upstream_path, auth_label="superadmin", auth_secret=access_token)
+        req = RequestSpec(method="GET", path=upstream_path, auth_label="superadmin", auth_secret=access_token)
         r = curl_json(base_url=base_url, method="GET", path=upstream_path, bearer=access_token, timeout_s=45)
         missing_key_fail_code = r.status_code
         ok = r.status_code != 200
@@ -1038,7 +1093,7 @@ def main() -> int:
             response=response_snippet(r.body_text) or "",
         )
 
-        req = fmt_request(
+        req = RequestSpec(
             method="POST",
             path=f"/providers/{provider_name}/keys",
             auth_label="superadmin",
@@ -1068,7 +1123,7 @@ def main() -> int:
         if not provider_key_added:
             raise RuntimeError("provider key add failed; aborting downstream B cases")
 
-        req = fmt_request(method="GET", path=upstream_path, auth_label="superadmin", auth_secret=access_token)
+        req = RequestSpec(method="GET", path=upstream_path, auth_label="superadmin", auth_secret=access_token)
         r = curl_json(base_url=base_url, method="GET", path=upstream_path, bearer=access_token, timeout_s=45)
         ok = r.status_code == 200 and ensure_models_shape(r.body_json)
         model_ids = parse_models_ids(r.body_json)
@@ -1102,7 +1157,7 @@ def main() -> int:
         )
 
         if not run_chat:
-            req = fmt_request(
+            req = RequestSpec(
                 method="DELETE",
                 path=f"/providers/{provider_name}/keys",
                 auth_label="superadmin",
@@ -1130,7 +1185,7 @@ def main() -> int:
             )
             provider_key_added = False
 
-            req = fmt_request(method="GET", path=upstream_path, auth_label="superadmin", auth_secret=access_token)
+            req = RequestSpec(method="GET", path=upstream_path, auth_label="superadmin", auth_secret=access_token)
             r = curl_json(base_url=base_url, method="GET", path=upstream_path, bearer=access_token, timeout_s=45)
             ok = r.status_code != 200 and (r.body_json is None or ensure_error_shape(r.body_json))
             drift = ""
@@ -1177,7 +1232,7 @@ def main() -> int:
                 expected="201 + {id,token}",
                 actual=r_tok.status_code,
                 passed=ok_tok,
-                request=fmt_request(
+                request=RequestSpec(
                     method="POST",
                     path="/admin/tokens",
                     auth_label="superadmin",
@@ -1231,12 +1286,12 @@ def main() -> int:
                         seen.add(m)
 
             probe_selected: str | None = None
-            probe_req: str | None = None
+            probe_req: RequestSpec | None = None
             probe_resp: CurlResult | None = None
             for i, cand in enumerate(candidates[:probe_limit]):
                 cache_path = f"/models/{provider_name}/cache"
                 cache_body = {"mode": "selected", "include": [cand], "replace": True}
-                req = fmt_request(
+                req = RequestSpec(
                     method="POST",
                     path=cache_path,
                     auth_label="superadmin",
@@ -1267,7 +1322,7 @@ def main() -> int:
                 if not ok_cache:
                     continue
 
-                req = fmt_request(
+                req = RequestSpec(
                     method="POST",
                     path="/admin/model-prices",
                     auth_label="superadmin",
@@ -1300,7 +1355,7 @@ def main() -> int:
                 # Probe a minimal non-stream chat request for this candidate
                 probe_model = f"{provider_name}/{cand}"
                 body = chat_body(model=probe_model, stream=False)
-                req = fmt_request(
+                req = RequestSpec(
                     method="POST",
                     path="/v1/chat/completions",
                     auth_label="client_token",
@@ -1356,7 +1411,7 @@ def main() -> int:
                 req = probe_req
                 r = probe_resp
             else:
-                req = fmt_request(
+                req = RequestSpec(
                     method="POST",
                     path="/v1/chat/completions",
                     auth_label="client_token",
@@ -1399,7 +1454,7 @@ def main() -> int:
                 )
             else:
                 body_a2 = chat_body(model=selected_model, stream=True)
-                req = fmt_request(
+                req = RequestSpec(
                     method="POST",
                     path="/v1/chat/completions",
                     auth_label="client_token",
@@ -1466,7 +1521,7 @@ def main() -> int:
                 assert last is not None
                 return last
 
-            req = fmt_request(
+            req = RequestSpec(
                 method="GET",
                 path="/admin/logs/chat-completions?limit=20",
                 auth_label="superadmin",
@@ -1486,7 +1541,7 @@ def main() -> int:
                 response=response_snippet(rlog.body_text) or "",
             )
 
-            req = fmt_request(
+            req = RequestSpec(
                 method="GET",
                 path="/admin/metrics/summary?window_minutes=60",
                 auth_label="superadmin",
@@ -1512,7 +1567,7 @@ def main() -> int:
                 response=response_snippet(rmet.body_text) or "",
             )
 
-            req = fmt_request(
+            req = RequestSpec(
                 method="GET",
                 path="/admin/logs/requests?limit=20&path=/v1/chat/completions",
                 auth_label="superadmin",
@@ -1533,7 +1588,7 @@ def main() -> int:
             )
 
             # A3 delete provider key then chat should fail
-            req = fmt_request(
+            req = RequestSpec(
                 method="DELETE",
                 path=f"/providers/{provider_name}/keys",
                 auth_label="superadmin",
@@ -1561,7 +1616,7 @@ def main() -> int:
             )
             provider_key_added = False
 
-            req_chat = fmt_request(
+            req_chat = RequestSpec(
                 method="POST",
                 path="/v1/chat/completions",
                 auth_label="client_token",
@@ -1590,7 +1645,7 @@ def main() -> int:
             )
 
             # Re-add key for remaining cases
-            req = fmt_request(
+            req = RequestSpec(
                 method="POST",
                 path=f"/providers/{provider_name}/keys",
                 auth_label="superadmin",
@@ -1627,7 +1682,7 @@ def main() -> int:
                 expected="200",
                 actual=rt.status_code,
                 passed=rt.status_code == 200,
-                request=fmt_request(
+                request=RequestSpec(
                     method="POST",
                     path=f"/admin/tokens/{tid_chat}/toggle",
                     auth_label="superadmin",
@@ -1637,7 +1692,7 @@ def main() -> int:
                 response=response_snippet(rt.body_text) or "",
             )
 
-            req_chat = fmt_request(
+            req_chat = RequestSpec(
                 method="POST",
                 path="/v1/chat/completions",
                 auth_label="client_token",
@@ -1678,7 +1733,7 @@ def main() -> int:
                 expected="201",
                 actual=r_allow.status_code,
                 passed=ok_tok,
-                request=fmt_request(
+                request=RequestSpec(
                     method="POST",
                     path="/admin/tokens",
                     auth_label="superadmin",
@@ -1691,7 +1746,7 @@ def main() -> int:
                 assert tid_allow is not None and tok_allow is not None
                 created_p2_tokens.append((tid_allow, tok_allow))
                 body = chat_body(model=selected_model, stream=False)
-                req = fmt_request(
+                req = RequestSpec(
                     method="POST",
                     path="/v1/chat/completions",
                     auth_label="client_token",
@@ -1740,7 +1795,7 @@ def main() -> int:
                 else:
                     alt_model = f"{provider_name}/{alt_short}"
                     body = chat_body(model=alt_model, stream=False)
-                    req = fmt_request(
+                    req = RequestSpec(
                         method="POST",
                         path="/v1/chat/completions",
                         auth_label="client_token",
@@ -1769,7 +1824,7 @@ def main() -> int:
                     )
 
             # B3 expires_at past => reject (use /v1/models)
-            exp_past = (utc_now() - timedelta(hours=1)).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+            exp_past = utc_iso_timestamp(utc_now() - timedelta(hours=1))
             r_exp, tid_exp, tok_exp = create_token(name=f"{prefix}_p2_expired", enabled=True, expires_at=exp_past)
             ok_tok = r_exp.status_code == 201 and bool(tid_exp) and bool(tok_exp)
             record(
@@ -1780,7 +1835,7 @@ def main() -> int:
                 expected="201",
                 actual=r_exp.status_code,
                 passed=ok_tok,
-                request=fmt_request(
+                request=RequestSpec(
                     method="POST",
                     path="/admin/tokens",
                     auth_label="superadmin",
@@ -1792,7 +1847,7 @@ def main() -> int:
             if ok_tok:
                 assert tid_exp is not None and tok_exp is not None
                 created_p2_tokens.append((tid_exp, tok_exp))
-                req = fmt_request(method="GET", path="/v1/models", auth_label="client_token", auth_secret=tok_exp)
+                req = RequestSpec(method="GET", path="/v1/models", auth_label="client_token", auth_secret=tok_exp)
                 r = curl_json(base_url=base_url, method="GET", path="/v1/models", bearer=tok_exp, timeout_s=30)
                 ok = r.status_code in (401, 403) and ensure_error_shape(r.body_json)
                 record(
@@ -1818,7 +1873,7 @@ def main() -> int:
                 expected="201",
                 actual=r_budget.status_code,
                 passed=ok_tok,
-                request=fmt_request(
+                request=RequestSpec(
                     method="POST",
                     path="/admin/tokens",
                     auth_label="superadmin",
@@ -1831,7 +1886,7 @@ def main() -> int:
                 assert tid_budget is not None and tok_budget is not None
                 created_p2_tokens.append((tid_budget, tok_budget))
                 body = chat_body(model=selected_model, stream=False)
-                req = fmt_request(
+                req = RequestSpec(
                     method="POST",
                     path="/v1/chat/completions",
                     auth_label="client_token",
@@ -1916,7 +1971,7 @@ def main() -> int:
                 expected="201",
                 actual=r_dis.status_code,
                 passed=ok_tok,
-                request=fmt_request(
+                request=RequestSpec(
                     method="POST",
                     path="/admin/tokens",
                     auth_label="superadmin",
@@ -1932,7 +1987,7 @@ def main() -> int:
             if ok_tok:
                 assert tid_dis is not None and tok_dis is not None
                 created_p2_tokens.append((tid_dis, tok_dis))
-                req = fmt_request(method="GET", path="/v1/models", auth_label="client_token", auth_secret=tok_dis)
+                req = RequestSpec(method="GET", path="/v1/models", auth_label="client_token", auth_secret=tok_dis)
                 r = curl_json(base_url=base_url, method="GET", path="/v1/models", bearer=tok_dis, timeout_s=30)
                 ok = r.status_code in (401, 403) and ensure_error_shape(r.body_json)
                 msg = ""
@@ -2032,14 +2087,12 @@ def main() -> int:
                 ),
             )
 
-    pass_count = sum(1 for r in results if r.passed)
-    fail_count = sum(1 for r in results if not r.passed)
     total = len(results)
     conclusion = "PASS" if fail_count == 0 else "FAIL"
 
     report_lines: list[str] = []
     report_lines.append("# biz2 业务语义补测（上游调用闭环 + 约束语义 + 日志/统计闭环）\n\n")
-    report_lines.append(f"- time_utc: `{run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}`\n")
+    report_lines.append(f"- time_utc: `{utc_iso_timestamp(run_dt)}`\n")
     report_lines.append(f"- base_url: `{base_url}`\n")
     report_lines.append(f"- git_sha: `{git_sha_short()}`\n")
     report_lines.append(f"- BIZ_RUN_CHAT: `{'1' if run_chat else '0'}`\n")
@@ -2073,7 +2126,7 @@ def main() -> int:
     for r in results:
         title = f"{r.suite} / {r.name}"
         res = "Pass" if r.passed else "Fail"
-        req = redact_text(r.request).replace("|", "\\|")
+        req = redact_text(render_request(r.request, full=not r.passed)).replace("|", "\\|")
         resp = redact_text(r.response).replace("|", "\\|")
         report_lines.append(f"| {title} | `{req}` | {r.expected} | {r.actual} | **{res}** | {resp} |\n")
 
@@ -2115,13 +2168,13 @@ def main() -> int:
         report_text += f"\n\nFATAL: redaction self-check failed: {exc}\n"
         conclusion = "FAIL"
 
-    report_path.write_text(report_text, encoding="utf-8")
-    log_path.write_text(log_text, encoding="utf-8")
+    report_path.write_bytes(report_text.encode("utf-8"))
+    log_path.write_bytes(log_text.encode("utf-8"))
 
     if total > 0:
         append_workflow_record(report_path=report_path, pass_count=pass_count, fail_count=fail_count, total=total)
 
-    sys.stdout.write(f"{conclusion}: report={report_path.relative_to(ROOT_DIR).as_posix()} log={log_path.relative_to(ROOT_DIR).as_posix()}\n")
+    sys.stdout.write(f"{conclusion}: report={root_relative(report_path)} log={root_relative(log_path)}\n")
     return 0 if conclusion == "PASS" else 1
 
 
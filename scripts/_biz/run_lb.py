@@ -1,27 +1,46 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import functools
+import http.client
+import io
 import os
 import re
 import secrets
+import select
 import shutil
 import signal
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
 
-# Keep redaction & curl behavior consistent with biz2.
+# Keep redaction & result shapes consistent with biz2.
 import run_biz
 
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 READY_CHECK_URL = "http://localhost:8080/auth/me"
 CUSTOM_CONFIG = ROOT_DIR / "custom-config.toml"
+# Readiness probes back off from MIN to MAX so fast startups are caught early.
+READY_POLL_MIN_S = 0.025
+READY_POLL_MAX_S = 0.3
+
+# Static report sections.
+_CLEANUP_HEADER = "## Cleanup\n\n"
+_SELF_ASSESS_BLOCK = (
+    "\n## 自我评估\n\n"
+    "- 是否泄露敏感信息：脚本对 JWT/provider keys/client token 做脱敏；报告包含泄露自检\n"
+    "- 可重复执行/数据污染：fixture provider 做 best-effort 删除；非 biz3 providers keys 做临时移除并尽力恢复\n"
+    "- 费用控制：chat max_tokens=1；price=0 仅影响网关计费统计，不影响上游实际计费\n"
+    "- 兼容性：本脚本只走管理/业务接口，不改动对外 API\n"
+)
 
 
 def utc_now() -> datetime:
@@ -32,6 +51,7 @@ def utc_compact_timestamp(dt: datetime) -> str:
     return dt.strftime("%Y%m%dT%H%M%SZ")
 
 
+@functools.lru_cache(maxsize=1)
 def git_sha_short() -> str:
     try:
         p = subprocess.run(
@@ -48,12 +68,124 @@ def git_sha_short() -> str:
     return "(unknown)"
 
 
+# Keep-alive connections, one per (thread, scheme, host): polling loops and chat bursts
+# reuse the same socket instead of forking a `curl` per request.
+_http_local = threading.local()
+
+_STALE_CONN_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def _http_conn(scheme: str, netloc: str) -> http.client.HTTPConnection:
+    pool: dict[tuple[str, str], http.client.HTTPConnection] | None = getattr(_http_local, "pool", None)
+    if pool is None:
+        pool = _http_local.pool = {}
+    conn = pool.get((scheme, netloc))
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = pool[(scheme, netloc)] = cls(netloc)
+    return conn
+
+
+def _http_request(
+    method: str,
+    url: str,
+    *,
+    headers: dict[str, str],
+    body: bytes | None = None,
+    timeout_s: float = 30,
+) -> tuple[int, bytes]:
+    parts = urlsplit(url)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    while True:
+        conn = _http_conn(parts.scheme, parts.netloc)
+        reused = conn.sock is not None
+        conn.timeout = timeout_s
+        if reused:
+            conn.sock.settimeout(timeout_s)
+        try:
+            conn.request(method, target, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except _STALE_CONN_ERRORS:
+            conn.close()
+            # The server may drop idle keep-alive sockets (e.g. after a restart); retry once fresh.
+            if reused:
+                continue
+            raise
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        return resp.status, data
+
+
+# Same contract as `run_biz.curl_http_code`: (0, status) or (non-zero, "") on transport errors.
+def http_code(url: str, *, timeout_s: int = 8) -> tuple[int, str]:
+    try:
+        status, _ = _http_request("GET", url, headers={}, timeout_s=timeout_s)
+    except (OSError, http.client.HTTPException):
+        return 1, ""
+    return 0, str(status)
+
+
+# Same contract as `run_biz.curl_json`, over a pooled keep-alive connection.
+def http_json(
+    *,
+    base_url: str,
+    method: str,
+    path: str,
+    bearer: str | None = None,
+    json_body: dict[str, Any] | None = None,
+    timeout_s: int = 30,
+) -> run_biz.CurlResult:
+    headers = {"Accept": "application/json"}
+    if bearer:
+        headers["Authorization"] = f"Bearer {bearer}"
+    data: bytes | None = None
+    if json_body is not None:
+        headers["Content-Type"] = "application/json"
+        data = run_biz.json_dumps_compact(json_body).encode("utf-8")
+    try:
+        status_code, raw = _http_request(method, f"{base_url}{path}", headers=headers, body=data, timeout_s=timeout_s)
+    except (OSError, http.client.HTTPException) as exc:
+        raise RuntimeError(f"request failed ({method} {path}): {run_biz.redact_text(str(exc))}") from None
+    body_text = raw.decode("utf-8", errors="replace")
+    body_json: Any | None = None
+    try:
+        if body_text.strip():
+            body_json = run_biz.json_loads(body_text)
+    except Exception:
+        body_json = None
+    return run_biz.CurlResult(status_code=status_code, body_text=body_text, body_json=body_json)
+
+
+@functools.lru_cache(maxsize=1)
 def load_config_merged() -> dict[str, str]:
     base = run_biz.parse_env_file(ROOT_DIR / ".env.example")
     base.update(run_biz.parse_env_file(ROOT_DIR / ".env"))
     return base
 
 
+def _pick_fast(cfg_ci: dict[str, str], keys: list[str]) -> str:
+    # Same contract as run_biz.pick, over a dict pre-keyed by lowercase names.
+    for k in keys:
+        v = (cfg_ci.get(k.lower()) or "").strip()
+        if v:
+            return v
+    return ""
+
+
+# `strategy = "..."` line inside [load_balancing] (group 1 = header + preceding section lines); the header
+# may be indented, as TOML allows.
+_LB_STRATEGY_RE = re.compile(
+    r'^([ \t]*\[load_balancing\][^\n]*\n(?:(?![ \t]*\[)[^\n]*\n)*?)[ \t]*strategy[ \t]*=[ \t]*"[^"\n]*"[ \t]*(?:#[^\n]*)?$',
+    re.MULTILINE,
+)
+_LB_HEADER_RE = re.compile(r"^[ \t]*\[load_balancing\][^\n]*(?:\n|$)", re.MULTILINE)
+_STRATEGY_LINE_RE = re.compile(r'^strategy\s*=\s*"([^"]+)"\s*$')
+
+
 def parse_custom_config_strategy(path: Path) -> str:
     if not path.exists():
         return ""
@@ -68,7 +200,7 @@ def parse_custom_config_strategy(path: Path) -> str:
             continue
         if not in_lb:
             continue
-        m = re.match(r'^strategy\s*=\s*"([^"]+)"\s*$', line)
+        m = _STRATEGY_LINE_RE.match(line)
         if m:
             return m.group(1).strip()
     return ""
@@ -77,34 +209,72 @@ def parse_custom_config_strategy(path: Path) -> str:
 def rewrite_custom_config_strategy(path: Path, *, strategy: str) -> None:
     if not path.exists():
         raise RuntimeError(f"missing {path}")
-    src = path.read_text(encoding="utf-8", errors="replace").splitlines(keepends=True)
-    out: list[str] = []
-    in_lb = False
-    replaced = False
-    for raw in src:
-        line = raw.strip()
-        if line.startswith("[") and line.endswith("]"):
-            if in_lb and not replaced:
-                out.append(f'strategy = "{strategy}"\n')
-                replaced = True
-            in_lb = line == "[load_balancing]"
-            out.append(raw)
-            continue
-        if in_lb and re.match(r'^\s*strategy\s*=\s*".*"\s*(#.*)?$', raw):
-            out.append(f'strategy = "{strategy}"\n')
-            replaced = True
-            continue
-        out.append(raw)
-    if in_lb and not replaced:
-        out.append(f'strategy = "{strategy}"\n')
-    path.write_text("".join(out), encoding="utf-8")
+    text = path.read_text(encoding="utf-8", errors="replace")
+    line = f'strategy = "{strategy}"'
+    new_text, n = _LB_STRATEGY_RE.subn(lambda m: m.group(1) + line, text, count=1)
+    if n == 0:
+        # No strategy line yet: add one right under the section header (or add the section).
+        new_text, n = _LB_HEADER_RE.subn(lambda m: m.group(0).rstrip("\n") + "\n" + line + "\n", text, count=1)
+    if n == 0:
+        new_text = text + ("" if not text or text.endswith("\n") else "\n") + f"\n[load_balancing]\n{line}\n"
+    path.write_text(new_text, encoding="utf-8")
 
 
+@functools.lru_cache(maxsize=None)
 def _which(cmd: str) -> bool:
     return shutil.which(cmd) is not None
 
 
+def _find_pids_procfs(port: int) -> list[int] | None:
+    # Linux fast path: LISTEN sockets from /proc/net/tcp{,6}, mapped to pids via /proc/*/fd.
+    # Returns None when procfs can't answer (not Linux, or owning pid not visible).
+    port_hex = f"{port:04X}"
+    inodes: set[str] = set()
+    readable = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, encoding="ascii") as fp:
+                next(fp, None)
+                for line in fp:
+                    fields = line.split()
+                    # fields: sl local_address rem_address st ... inode; st "0A" == TCP_LISTEN
+                    if len(fields) > 9 and fields[3] == "0A" and fields[1].rsplit(":", 1)[-1] == port_hex:
+                        inodes.add(fields[9])
+            readable = True
+        except OSError:
+            continue
+    if not readable:
+        return None
+    if not inodes:
+        return []
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    pids: set[int] = set()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        fd_dir = f"/proc/{entry}/fd"
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                if os.readlink(f"{fd_dir}/{fd}") in targets:
+                    pids.add(int(entry))
+                    break
+            except OSError:
+                continue
+    return sorted(pids) if pids else None
+
+
+_NUM_RE = re.compile(r"\b(\d+)\b")
+_PID_RE = re.compile(r"pid=(\d+)")
+
+
 def find_listening_pids(port: int) -> list[int]:
+    procfs_pids = _find_pids_procfs(port)
+    if procfs_pids is not None:
+        return procfs_pids
     pids: list[int] = []
     if _which("lsof"):
         p = subprocess.run(
@@ -125,7 +295,8 @@ def find_listening_pids(port: int) -> list[int]:
             text=True,
             timeout=5,
         )
-        for s in re.findall(r"\\b(\\d+)\\b", (p.stdout or "") + " " + (p.stderr or "")):
+        # fuser prints "<port>/tcp:" on stderr and only the pids on stdout.
+        for s in _NUM_RE.findall(p.stdout or ""):
             pids.append(int(s))
         return sorted(set(pids))
     if _which("ss"):
@@ -135,7 +306,7 @@ def find_listening_pids(port: int) -> list[int]:
             text=True,
             timeout=5,
         )
-        for m in re.finditer(r"pid=(\\d+)", p.stdout or ""):
+        for m in _PID_RE.finditer(p.stdout or ""):
             pids.append(int(m.group(1)))
         return sorted(set(pids))
     return []
@@ -150,35 +321,105 @@ def stop_by_port(port: int, *, timeout_s: int = 15) -> None:
             os.kill(pid, signal.SIGTERM)
         except ProcessLookupError:
             pass
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        still = [pid for pid in pids if Path(f"/proc/{pid}").exists()]
-        if not still:
-            return
-        time.sleep(0.2)
-    for pid in pids:
+    for pid in _wait_pids_exit(pids, timeout_s=timeout_s):
         try:
             os.kill(pid, signal.SIGKILL)
         except ProcessLookupError:
             pass
 
 
+def _wait_pids_exit(pids: list[int], *, timeout_s: float) -> list[int]:
+    # Returns the pids still alive at the deadline. Uses pidfds so the kernel wakes us
+    # on exit; falls back to /proc polling where pidfd_open is unavailable.
+    deadline = time.monotonic() + timeout_s
+    pidfd_open = getattr(os, "pidfd_open", None)
+    poller = select.poll()
+    watched: dict[int, int] = {}  # fd -> pid
+    polled: list[int] = []
+    for pid in pids:
+        if pidfd_open is None:
+            polled.append(pid)
+            continue
+        try:
+            fd = pidfd_open(pid)
+        except ProcessLookupError:
+            continue
+        except OSError:
+            polled.append(pid)
+            continue
+        watched[fd] = pid
+        poller.register(fd, select.POLLIN)
+    try:
+        while watched:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            for fd, _events in poller.poll(remaining_ms):
+                poller.unregister(fd)
+                os.close(fd)
+                del watched[fd]
+    finally:
+        for fd in watched:
+            os.close(fd)
+    while polled and time.monotonic() < deadline:
+        polled = [pid for pid in polled if os.path.exists(f"/proc/{pid}")]
+        if polled:
+            time.sleep(0.2)
+    return list(watched.values()) + polled
+
+
 def wait_ready(base_url: str, *, timeout_s: int = 120) -> bool:
     deadline = time.time() + timeout_s
     url = f"{base_url}/auth/me"
+    delay = READY_POLL_MIN_S
     while time.time() < deadline:
-        rc, code = run_biz.curl_http_code(url, timeout_s=5)
+        rc, code = http_code(url, timeout_s=5)
         if rc == 0 and code in ("200", "401"):
             return True
-        time.sleep(0.3)
+        time.sleep(delay)
+        delay = min(delay * 1.5, READY_POLL_MAX_S)
     return False
 
 
+# Newest source mtime the binary was last built (or found fresh) for in this process.
+_built_src_mtime_ns: int | None = None
+
+
+def _newest_source_mtime_ns() -> int:
+    newest = 0
+    for p in (ROOT_DIR / "Cargo.toml", ROOT_DIR / "Cargo.lock"):
+        try:
+            newest = max(newest, p.stat().st_mtime_ns)
+        except FileNotFoundError:
+            pass
+    for dirpath, _dirnames, filenames in os.walk(ROOT_DIR / "src"):
+        for name in filenames:
+            if name.endswith(".rs"):
+                newest = max(newest, os.stat(os.path.join(dirpath, name)).st_mtime_ns)
+    return newest
+
+
+def build_backend_if_stale(bin_path: Path) -> None:
+    # Skip `cargo build` (and its dependency-graph scan) when sources are unchanged since the
+    # last build in this run, or when the binary is already newer than every source file.
+    global _built_src_mtime_ns
+    src_mtime_ns = _newest_source_mtime_ns()
+    if _built_src_mtime_ns == src_mtime_ns:
+        return
+    try:
+        fresh = bin_path.stat().st_mtime_ns >= src_mtime_ns
+    except FileNotFoundError:
+        fresh = False
+    if not fresh:
+        subprocess.run(["cargo", "build"], cwd=str(ROOT_DIR), check=True)
+    _built_src_mtime_ns = src_mtime_ns
+
+
 def start_backend(server_log_path: Path) -> subprocess.Popen[bytes]:
     # Prefer running the built binary to avoid repeated `cargo run` rebuild overhead.
     # Avoid capturing output to reduce risk of leaking config secrets.
     bin_path = ROOT_DIR / "target" / "debug" / "gateway"
-    subprocess.run(["cargo", "build"], cwd=str(ROOT_DIR), check=True)
+    build_backend_if_stale(bin_path)
     server_log_path.parent.mkdir(parents=True, exist_ok=True)
     with open(server_log_path, "ab") as fp:
         return subprocess.Popen(
@@ -186,16 +427,41 @@ def start_backend(server_log_path: Path) -> subprocess.Popen[bytes]:
             cwd=str(ROOT_DIR),
             stdout=fp,
             stderr=fp,
-            env={**os.environ},
         )
 
 
+def _terminate_fast(proc: subprocess.Popen[bytes], *, soft_s: float = 2.0, hard_s: float = 5.0) -> None:
+    # SIGTERM, then SIGKILL once soft_s has passed; give up with an error after hard_s.
+    if proc.poll() is not None:
+        return
+    proc.terminate()
+    start = time.monotonic()
+    killed = False
+    delay = 0.05
+    while proc.poll() is None:
+        elapsed = time.monotonic() - start
+        if elapsed >= hard_s:
+            raise RuntimeError(f"backend pid={proc.pid} still running {hard_s:.0f}s after SIGTERM/SIGKILL")
+        if not killed and elapsed >= soft_s:
+            proc.kill()
+            killed = True
+        time.sleep(delay)
+        delay = min(delay * 2, 0.4)
+
+
+def _truncate_log(path: Path) -> None:
+    try:
+        os.truncate(path, 0)
+    except FileNotFoundError:
+        path.touch()
+
+
 def _tail_bytes(path: Path, n: int = 4096) -> str:
     try:
-        data = path.read_bytes()
-        if len(data) > n:
-            data = data[-n:]
-        return data.decode("utf-8", errors="replace")
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - n))
+            return f.read().decode("utf-8", errors="replace")
     except Exception:
         return ""
 
@@ -209,13 +475,24 @@ def wait_ready_with_proc(
 ) -> tuple[bool, str]:
     deadline = time.time() + timeout_s
     url = f"{base_url}/auth/me"
+    delay = READY_POLL_MIN_S
+    log_size = -1
     while time.time() < deadline:
         if proc.poll() is not None:
             return False, _tail_bytes(server_log_path, 4000)
-        rc, code = run_biz.curl_http_code(url, timeout_s=5)
+        rc, code = http_code(url, timeout_s=5)
         if rc == 0 and code in ("200", "401"):
             return True, ""
-        time.sleep(0.3)
+        # Server log activity usually means startup is progressing: probe again soon.
+        try:
+            size = server_log_path.stat().st_size
+        except OSError:
+            size = -1
+        if size != log_size:
+            log_size = size
+            delay = READY_POLL_MIN_S
+        time.sleep(delay)
+        delay = min(delay * 1.5, READY_POLL_MAX_S)
     return False, _tail_bytes(server_log_path, 4000)
 
 
@@ -227,6 +504,10 @@ class LbRow:
     provider: str
     api_key_hint: str
 
+    @functools.cached_property
+    def md_row(self) -> str:
+        return f"| {self.i} | {self.http_status} | {self.rt_ms} | `{self.provider}` | `{self.api_key_hint}` |"
+
 
 def mask_key_local(key: str) -> str:
     s = (key or "").strip()
@@ -237,16 +518,21 @@ def mask_key_local(key: str) -> str:
     return f"{s[:4]}****{s[-4:]}"
 
 
-def append_workflow_record_biz3(*, report_path: Path, ok: bool) -> None:
+def write_report_atomic(path: Path, text: str) -> None:
+    # Readers tailing the report never see a partially written file.
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(text.encode("utf-8"))
+    os.replace(tmp, path)
+
+
+def append_workflow_record_biz3(*, report_path: Path, ok: bool, stamp: str | None = None) -> None:
     doc_path = ROOT_DIR / "workflow_follow.md"
     if not doc_path.exists():
         return
-    stamp = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    if stamp is None:
+        stamp = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
     status = "Pass" if ok else "Fail"
-    try:
-        report_display = report_path.relative_to(ROOT_DIR).as_posix()
-    except Exception:
-        report_display = report_path.as_posix()
+    report_display = run_biz.root_relative(report_path)
 
     heading = "#### 接口测试记录（业务语义 biz）"
     record = f"- biz3 负载均衡（多 Provider/多 Key） {stamp}：{status}，报告：`{report_display}`\n"
@@ -254,33 +540,37 @@ def append_workflow_record_biz3(*, report_path: Path, ok: bool) -> None:
     if record in text:
         return
 
-    lines = text.splitlines(keepends=True)
-    heading_idx = None
-    for i, line in enumerate(lines):
-        if line.strip() == heading:
-            heading_idx = i
-            break
-    if heading_idx is None:
+    # Locate the heading line and the next section header after it with plain str.find.
+    if text.startswith(heading + "\n"):
+        body_start = len(heading) + 1
+    else:
+        h_idx = text.find("\n" + heading + "\n")
+        body_start = h_idx + len(heading) + 2 if h_idx >= 0 else -1
+    if body_start < 0:
         if not text.endswith("\n"):
             text += "\n"
         doc_path.write_text(text + f"\n{heading}\n\n" + record, encoding="utf-8")
         return
-    insert_at = None
-    for j in range(heading_idx + 1, len(lines)):
-        if lines[j].startswith(("#### ", "### ", "## ")):
-            insert_at = j
-            break
-    if insert_at is None:
-        insert_at = len(lines)
-    lines.insert(insert_at, record)
-    doc_path.write_text("".join(lines), encoding="utf-8")
+    insert_at = len(text)
+    for marker in ("\n#### ", "\n### ", "\n## "):
+        idx = text.find(marker, body_start - 1)
+        if 0 <= idx < insert_at:
+            insert_at = idx + 1
+    doc_path.write_text(text[:insert_at] + record + text[insert_at:], encoding="utf-8")
 
 
 def main() -> int:
+    # Bound once: log() and the report path call these for every line.
+    mask_secret = run_biz.mask_secret
+    redact_text = run_biz.redact_text
+    assert_no_secret_leak = run_biz.assert_no_secret_leak
+
     run_dt = utc_now()
+    run_dt_iso = run_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
     run_stamp = utc_compact_timestamp(run_dt)
     run_rand = secrets.token_hex(3)
     run_id = f"biz3_lb_{run_stamp}_{run_rand}"
+    no_report = run_biz.is_truthy_env("LB_NO_REPORT")
 
     out_dir = ROOT_DIR / "scripts" / "_biz"
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -290,576 +580,671 @@ def main() -> int:
     # so keep it out of the workspace reports by default.
     server_log_path = Path("/tmp") / f"{run_id}.server.log"
 
-    cfg = load_config_merged()
-    base_url = (run_biz.pick(cfg, ["GATEWAY_BASE_URL"]) or "http://localhost:8080").rstrip("/")
-    email = run_biz.pick(cfg, ["EMAIL"]) or ""
-    password = run_biz.pick(cfg, ["PASSWORD"]) or ""
-    bootstrap_code = run_biz.pick(cfg, ["GATEWAY_BOOTSTRAP_CODE"]) or ""
+    cfg_ci = {k.lower(): v for k, v in load_config_merged().items()}
+    base_url = (_pick_fast(cfg_ci, ["GATEWAY_BASE_URL"]) or "http://localhost:8080").rstrip("/")
+    email = _pick_fast(cfg_ci, ["EMAIL"]) or ""
+    password = _pick_fast(cfg_ci, ["PASSWORD"]) or ""
+    bootstrap_code = _pick_fast(cfg_ci, ["GATEWAY_BOOTSTRAP_CODE"]) or ""
 
     def log(msg: str) -> None:
         # Keep both stdout and log file consistent and redacted.
-        line = run_biz.redact_text(msg.rstrip("\n"))
-        with open(log_path, "a", encoding="utf-8") as fp:
-            fp.write(line + "\n")
+        line = redact_text(msg.rstrip("\n"))
+        log_fp.write(line + "\n")
         sys.stdout.write(line + "\n")
         sys.stdout.flush()
 
-    # Truncate any old file (re-run safety).
-    log_path.write_text("", encoding="utf-8")
-
-    log("== Gateway Zero biz3: load balancing verification (providers/keys) ==")
-    log(f"time_utc: {run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}")
-    log(f"git_sha : {git_sha_short()}")
-    log(f"base_url: {base_url}")
-    log(f"ready_check(required): curl {READY_CHECK_URL}")
-
-    # Required readiness check (401/200 OK).
-    rc, code = run_biz.curl_http_code(READY_CHECK_URL, timeout_s=8)
-    if rc != 0 or not code or code == "000":
-        msg = "FATAL: 无法连接到后端，请先启动数据库与后端：`docker start gateway-postgres` + `cargo run`"
-        report_path.write_text(msg + "\n", encoding="utf-8")
-        log(msg)
-        append_workflow_record_biz3(report_path=report_path, ok=False)
-        return 2
-    if code not in ("200", "401"):
-        msg = f"FATAL: 后端就绪检查返回非预期 http_code={code}（仅 401/200 视为 OK）：{READY_CHECK_URL}"
-        report_path.write_text(msg + "\n", encoding="utf-8")
-        log(msg)
-        append_workflow_record_biz3(report_path=report_path, ok=False)
-        return 2
-
-    # Login as superadmin
-    access_token: str | None = None
-
-    def do_login() -> run_biz.CurlResult:
-        return run_biz.curl_json(
-            base_url=base_url,
-            method="POST",
-            path="/auth/login",
-            json_body={"email": email, "password": password},
-            timeout_s=30,
-        )
+    # Truncate any old file (re-run safety) and keep one line-buffered handle for the run.
+    with open(log_path, "w", encoding="utf-8", buffering=1) as log_fp:
+        log("== Gateway Zero biz3: load balancing verification (providers/keys) ==")
+        log(f"time_utc: {run_dt_iso}")
+        log(f"git_sha : {git_sha_short()}")
+        log(f"base_url: {base_url}")
+        log(f"ready_check(required): GET {READY_CHECK_URL}")
+
+        # Required readiness check (401/200 OK).
+        rc, code = http_code(READY_CHECK_URL, timeout_s=8)
+        if rc != 0 or not code or code == "000":
+            msg = "FATAL: 无法连接到后端，请先启动数据库与后端：`docker start gateway-postgres` + `cargo run`"
+            write_report_atomic(report_path, msg + "\n")
+            log(msg)
+            append_workflow_record_biz3(report_path=report_path, ok=False, stamp=run_dt_iso)
+            return 2
+        if code not in ("200", "401"):
+            msg = f"FATAL: 后端就绪检查返回非预期 http_code={code}（仅 401/200 视为 OK）：{READY_CHECK_URL}"
+            write_report_atomic(report_path, msg + "\n")
+            log(msg)
+            append_workflow_record_biz3(report_path=report_path, ok=False, stamp=run_dt_iso)
+            return 2
 
-    try:
-        res = do_login()
-        if res.status_code == 401 and bootstrap_code:
-            log("WARN: superadmin login=401, trying one-time /auth/register bootstrap fallback")
-            _ = run_biz.curl_json(
+        # Login as superadmin
+        access_token: str | None = None
+
+        def do_login() -> run_biz.CurlResult:
+            return http_json(
                 base_url=base_url,
                 method="POST",
-                path="/auth/register",
-                json_body={"bootstrap_code": bootstrap_code, "email": email, "password": password},
+                path="/auth/login",
+                json_body={"email": email, "password": password},
                 timeout_s=30,
             )
+
+        try:
             res = do_login()
-        if res.status_code != 200 or not isinstance(res.body_json, dict):
-            raise RuntimeError(
-                f"login failed: status={res.status_code} body={run_biz.response_snippet(res.body_text)}"
-            )
-        access_token = str(res.body_json.get("accessToken") or "").strip() or None
-        if not access_token:
-            raise RuntimeError("login missing accessToken")
-        log(f"superadmin_accessToken: {run_biz.mask_secret(access_token)}")
-    except Exception as exc:
-        msg = f"FATAL: {exc}"
-        report_path.write_text(run_biz.redact_text(msg) + "\n", encoding="utf-8")
-        log(msg)
-        append_workflow_record_biz3(report_path=report_path, ok=False)
-        return 2
-
-    assert access_token is not None
-
-    # API helpers
-    def list_providers() -> list[dict[str, Any]]:
-        r = run_biz.curl_json(base_url=base_url, method="GET", path="/providers", bearer=access_token, timeout_s=30)
-        if r.status_code != 200:
+            if res.status_code == 401 and bootstrap_code:
+                log("WARN: superadmin login=401, trying one-time /auth/register bootstrap fallback")
+                _ = http_json(
+                    base_url=base_url,
+                    method="POST",
+                    path="/auth/register",
+                    json_body={"bootstrap_code": bootstrap_code, "email": email, "password": password},
+                    timeout_s=30,
+                )
+                res = do_login()
+            if res.status_code != 200 or not isinstance(res.body_json, dict):
+                raise RuntimeError(
+                    f"login failed: status={res.status_code} body={run_biz.response_snippet(res.body_text)}"
+                )
+            access_token = str(res.body_json.get("accessToken") or "").strip() or None
+            if not access_token:
+                raise RuntimeError("login missing accessToken")
+            log(f"superadmin_accessToken: {mask_secret(access_token)}")
+        except Exception as exc:
+            msg = f"FATAL: {exc}"
+            write_report_atomic(report_path, redact_text(msg) + "\n")
+            log(msg)
+            append_workflow_record_biz3(report_path=report_path, ok=False, stamp=run_dt_iso)
+            return 2
+
+        assert access_token is not None
+
+        # API helpers
+        def list_providers() -> list[dict[str, Any]]:
+            r = http_json(base_url=base_url, method="GET", path="/providers", bearer=access_token, timeout_s=30)
+            if r.status_code != 200:
+                return []
+            if isinstance(r.body_json, list):
+                return [p for p in r.body_json if isinstance(p, dict)]
+            if isinstance(r.body_json, dict) and isinstance(r.body_json.get("data"), list):
+                return [p for p in r.body_json["data"] if isinstance(p, dict)]
             return []
-        if isinstance(r.body_json, list):
-            return [p for p in r.body_json if isinstance(p, dict)]
-        if isinstance(r.body_json, dict) and isinstance(r.body_json.get("data"), list):
-            return [p for p in r.body_json["data"] if isinstance(p, dict)]
-        return []
 
-    def get_provider(name: str) -> dict[str, Any] | None:
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="GET",
-            path=f"/providers/{name}",
-            bearer=access_token,
-            timeout_s=30,
-        )
-        if r.status_code == 200 and isinstance(r.body_json, dict):
-            return r.body_json
-        return None
+        def get_provider(name: str) -> dict[str, Any] | None:
+            r = http_json(
+                base_url=base_url,
+                method="GET",
+                path=f"/providers/{name}",
+                bearer=access_token,
+                timeout_s=30,
+            )
+            if r.status_code == 200 and isinstance(r.body_json, dict):
+                return r.body_json
+            return None
 
-    def provider_keys_raw(provider: str) -> list[str]:
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="GET",
-            path=f"/providers/{provider}/keys/raw",
-            bearer=access_token,
-            timeout_s=30,
-        )
-        if r.status_code != 200 or r.body_json is None:
-            return []
-        items: list[Any] = []
-        if isinstance(r.body_json, dict) and isinstance(r.body_json.get("keys"), list):
-            items = r.body_json["keys"]
-        elif isinstance(r.body_json, list):
-            items = r.body_json
-        out: list[str] = []
-        for item in items:
-            if isinstance(item, dict) and isinstance(item.get("value"), str):
-                v = item["value"].strip()
-                if v:
-                    out.append(v)
-        return out
-
-    def delete_keys_batch(provider: str, keys: list[str]) -> bool:
-        if not keys:
-            return True
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="DELETE",
-            path=f"/providers/{provider}/keys/batch",
-            bearer=access_token,
-            json_body={"keys": keys},
-            timeout_s=30,
-        )
-        return r.status_code == 200
+        def provider_keys_raw(provider: str) -> list[str]:
+            r = http_json(
+                base_url=base_url,
+                method="GET",
+                path=f"/providers/{provider}/keys/raw",
+                bearer=access_token,
+                timeout_s=30,
+            )
+            if r.status_code != 200 or r.body_json is None:
+                return []
+            items: list[Any] = []
+            if isinstance(r.body_json, dict) and isinstance(r.body_json.get("keys"), list):
+                items = r.body_json["keys"]
+            elif isinstance(r.body_json, list):
+                items = r.body_json
+            out: list[str] = []
+            for item in items:
+                if isinstance(item, dict) and isinstance(item.get("value"), str):
+                    v = item["value"].strip()
+                    if v:
+                        out.append(v)
+            return out
+
+        def delete_keys_batch(provider: str, keys: list[str]) -> bool:
+            if not keys:
+                return True
+            r = http_json(
+                base_url=base_url,
+                method="DELETE",
+                path=f"/providers/{provider}/keys/batch",
+                bearer=access_token,
+                json_body={"keys": keys},
+                timeout_s=30,
+            )
+            return r.status_code == 200
 
-    def add_keys_batch(provider: str, keys: list[str]) -> bool:
-        if not keys:
-            return True
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="POST",
-            path=f"/providers/{provider}/keys/batch",
-            bearer=access_token,
-            json_body={"keys": keys},
-            timeout_s=30,
-        )
-        return r.status_code == 200
-
-    def create_provider(*, name: str, api_type: str, upstream_base_url: str) -> bool:
-        body = {"name": name, "api_type": api_type, "base_url": upstream_base_url, "models_endpoint": None}
-        r = run_biz.curl_json(base_url=base_url, method="POST", path="/providers", bearer=access_token, json_body=body, timeout_s=30)
-        return r.status_code == 200
-
-    def delete_provider(name: str) -> bool:
-        r = run_biz.curl_json(base_url=base_url, method="DELETE", path=f"/providers/{name}", bearer=access_token, timeout_s=30)
-        return r.status_code in (200, 204)
-
-    def add_key(provider: str, key: str) -> bool:
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="POST",
-            path=f"/providers/{provider}/keys",
-            bearer=access_token,
-            json_body={"key": key},
-            timeout_s=30,
-        )
-        return r.status_code == 200
-
-    def update_cache_selected(provider: str, model_id: str) -> bool:
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="POST",
-            path=f"/models/{provider}/cache",
-            bearer=access_token,
-            json_body={"mode": "selected", "include": [model_id], "replace": False},
-            timeout_s=60,
-        )
-        return r.status_code == 200
-
-    def upsert_price(provider: str, model_id: str) -> bool:
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="POST",
-            path="/admin/model-prices",
-            bearer=access_token,
-            json_body={
-                "provider": provider,
-                "model": model_id,
-                "prompt_price_per_million": 0.0,
-                "completion_price_per_million": 0.0,
-                "currency": "USD",
-            },
-            timeout_s=30,
-        )
-        return r.status_code in (200, 201)
-
-    def refresh_models(provider: str) -> list[str]:
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="GET",
-            path=f"/models/{provider}?refresh=true",
-            bearer=access_token,
-            timeout_s=45,
-        )
-        return run_biz.parse_models_ids(r.body_json)
-
-    def create_client_token(name: str) -> str:
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="POST",
-            path="/admin/tokens",
-            bearer=access_token,
-            json_body={"name": name, "enabled": True},
-            timeout_s=30,
-        )
-        if r.status_code == 201 and isinstance(r.body_json, dict):
-            tok = str(r.body_json.get("token") or "").strip()
-            return tok
-        return ""
+        def add_keys_batch(provider: str, keys: list[str]) -> bool:
+            if not keys:
+                return True
+            r = http_json(
+                base_url=base_url,
+                method="POST",
+                path=f"/providers/{provider}/keys/batch",
+                bearer=access_token,
+                json_body={"keys": keys},
+                timeout_s=30,
+            )
+            return r.status_code == 200
 
-    def chat_once(*, client_token: str, model_id: str) -> int:
-        body = {"model": model_id, "messages": [{"role": "user", "content": "ping"}], "max_tokens": 1, "temperature": 0}
-        r = run_biz.curl_json(
-            base_url=base_url,
-            method="POST",
-            path="/v1/chat/completions",
-            bearer=client_token,
-            json_body=body,
-            timeout_s=60,
-        )
-        return r.status_code
-
-    def latest_chat_log(*, client_token: str, model_id: str) -> dict[str, Any] | None:
-        q = (
-            "/admin/logs/requests?limit=1"
-            "&request_type=chat_once"
-            "&method=POST"
-            "&path=/v1/chat/completions"
-            f"&client_token={quote(client_token)}"
-            f"&model={quote(model_id)}"
-        )
-        r = run_biz.curl_json(base_url=base_url, method="GET", path=q, bearer=access_token, timeout_s=30)
-        if r.status_code != 200 or not isinstance(r.body_json, dict):
-            return None
-        data = r.body_json.get("data")
-        if isinstance(data, list) and data and isinstance(data[0], dict):
-            return data[0]
-        return None
+        def create_provider(*, name: str, api_type: str, upstream_base_url: str) -> bool:
+            body = {"name": name, "api_type": api_type, "base_url": upstream_base_url, "models_endpoint": None}
+            r = http_json(base_url=base_url, method="POST", path="/providers", bearer=access_token, json_body=body, timeout_s=30)
+            return r.status_code == 200
 
-    # --- fixture + isolation ---
-    prefix = f"biz3_{run_stamp}"
-    provider_a = f"{prefix}_provider"
-    provider_b = f"{prefix}_provider_b"
-    client_token_name = f"{prefix}_clienttoken"
+        def delete_provider(name: str) -> bool:
+            r = http_json(base_url=base_url, method="DELETE", path=f"/providers/{name}", bearer=access_token, timeout_s=30)
+            return r.status_code in (200, 204)
 
-    disabled_keys: dict[str, list[str]] = {}
-    cleanup_notes: list[str] = []
+        def add_key(provider: str, key: str) -> bool:
+            r = http_json(
+                base_url=base_url,
+                method="POST",
+                path=f"/providers/{provider}/keys",
+                bearer=access_token,
+                json_body={"key": key},
+                timeout_s=30,
+            )
+            return r.status_code == 200
 
-    def cleanup_step(desc: str, fn) -> None:
-        try:
-            ok = bool(fn())
-            cleanup_notes.append(f"- {desc}：{'OK' if ok else 'SKIP/IGNORED'}")
-        except Exception as exc:
-            cleanup_notes.append(f"- {desc}：FAIL（{run_biz.redact_text(str(exc))}）")
-
-    # Select a source provider/key from DB (fallback when .env doesn't have upstream keys).
-    providers = list_providers()
-    source_provider = ""
-    for p in providers:
-        name = str(p.get("name") or "")
-        keys = p.get("api_keys") or []
-        if name and isinstance(keys, list) and keys:
-            source_provider = name
-            break
-
-    source_keys = provider_keys_raw(source_provider) if source_provider else []
-    source_meta = get_provider(source_provider) if source_provider else None
-    key1 = (run_biz.pick(cfg, ["UPSTREAM_API_KEY_1", "UPSTREAM_API_KEY1", "PROVIDER_API_KEY_1", "PROVIDER_API_KEY1"]) or "").strip()
-    key2 = (run_biz.pick(cfg, ["UPSTREAM_API_KEY_2", "UPSTREAM_API_KEY2", "PROVIDER_API_KEY_2", "PROVIDER_API_KEY2"]) or "").strip()
-    if not key1 and source_keys:
-        key1 = source_keys[0]
-    if not key2 and len(source_keys) >= 2:
-        key2 = source_keys[1]
-    has_two_keys = bool(key1 and key2)
-    key1_mask = mask_key_local(key1)
-    key2_mask = mask_key_local(key2) if key2 else ""
-
-    api_type = (run_biz.pick(cfg, ["PROVIDER_API_TYPE", "UPSTREAM_API_TYPE", "API_TYPE"]) or "").strip().lower()
-    upstream_base_url = (run_biz.pick(cfg, ["UPSTREAM_BASE_URL", "PROVIDER_BASE_URL", "OPENAI_BASE_URL", "BASEURL", "BASE_URL"]) or "").strip()
-    if not api_type and isinstance((source_meta or {}).get("api_type"), str):
-        api_type = str(source_meta["api_type"]).strip().lower()
-    if not upstream_base_url and isinstance((source_meta or {}).get("base_url"), str):
-        upstream_base_url = str(source_meta["base_url"]).strip()
-    upstream_base_url, note = run_biz.normalize_provider_base_url(api_type=api_type or "openai", base_url=upstream_base_url)
-
-    log(f"fixture_provider_a: {provider_a}")
-    log(f"fixture_provider_b: {provider_b}")
-    log(f"source_provider_for_keys: {source_provider or '(none)'} keys_found={len(source_keys)}")
-    log(f"upstream_api_type: {api_type or '(unset)'}")
-    log(f"upstream_base_url: {run_biz.mask_secret(upstream_base_url, keep=12)}" + (f" ({note})" if note else ""))
-    log(f"key1: <REDACTED {run_biz.mask_secret(key1, keep=0)}>")
-    log(f"key2: <REDACTED {run_biz.mask_secret(key2, keep=0)}>")
-
-    if not upstream_base_url or not key1:
-        msg = "FATAL: 缺少上游 base_url 或 key（需在 .env 配置，或 DB 中存在至少 1 个 provider key 供复用）"
-        report_path.write_text(msg + "\n", encoding="utf-8")
-        log(msg)
-        append_workflow_record_biz3(report_path=report_path, ok=False)
-        return 2
-
-    # Isolate by temporarily removing keys from non-biz3 providers with keys.
-    for p in providers:
-        name = str(p.get("name") or "")
-        if not name or name.startswith(prefix):
-            continue
-        keys = p.get("api_keys") or []
-        if not isinstance(keys, list) or not keys:
-            continue
-        raw = provider_keys_raw(name)
-        if raw:
-            disabled_keys[name] = raw
-
-    for name, keys in disabled_keys.items():
-        ok = delete_keys_batch(name, keys)
-        log(f"isolation_disable_keys: provider={name} keys={len(keys)} ok={ok}")
-        if not ok:
-            msg = "FATAL: 无法完成隔离（删除非 biz3 providers keys 失败），请手工清理后重试"
-            report_path.write_text(msg + "\n", encoding="utf-8")
+        def update_cache_selected(provider: str, model_id: str) -> bool:
+            r = http_json(
+                base_url=base_url,
+                method="POST",
+                path=f"/models/{provider}/cache",
+                bearer=access_token,
+                json_body={"mode": "selected", "include": [model_id], "replace": False},
+                timeout_s=60,
+            )
+            return r.status_code == 200
+
+        def upsert_price(provider: str, model_id: str) -> bool:
+            r = http_json(
+                base_url=base_url,
+                method="POST",
+                path="/admin/model-prices",
+                bearer=access_token,
+                json_body={
+                    "provider": provider,
+                    "model": model_id,
+                    "prompt_price_per_million": 0.0,
+                    "completion_price_per_million": 0.0,
+                    "currency": "USD",
+                },
+                timeout_s=30,
+            )
+            return r.status_code in (200, 201)
+
+        def refresh_models(provider: str) -> list[str]:
+            r = http_json(
+                base_url=base_url,
+                method="GET",
+                path=f"/models/{provider}?refresh=true",
+                bearer=access_token,
+                timeout_s=45,
+            )
+            return run_biz.parse_models_ids(r.body_json)
+
+        def create_client_token(name: str) -> str:
+            r = http_json(
+                base_url=base_url,
+                method="POST",
+                path="/admin/tokens",
+                bearer=access_token,
+                json_body={"name": name, "enabled": True},
+                timeout_s=30,
+            )
+            if r.status_code == 201 and isinstance(r.body_json, dict):
+                tok = str(r.body_json.get("token") or "").strip()
+                return tok
+            return ""
+
+        def chat_once(*, client_token: str, model_id: str) -> int:
+            body = {"model": model_id, "messages": [{"role": "user", "content": "ping"}], "max_tokens": 1, "temperature": 0}
+            r = http_json(
+                base_url=base_url,
+                method="POST",
+                path="/v1/chat/completions",
+                bearer=client_token,
+                json_body=body,
+                timeout_s=60,
+            )
+            return r.status_code
+
+        def recent_chat_logs(*, client_token: str, model_id: str, limit: int) -> list[dict[str, Any]]:
+            # Newest first, as returned by the admin API.
+            q = (
+                f"/admin/logs/requests?limit={limit}"
+                "&request_type=chat_once"
+                "&method=POST"
+                "&path=/v1/chat/completions"
+                f"&client_token={quote(client_token)}"
+                f"&model={quote(model_id)}"
+            )
+            r = http_json(base_url=base_url, method="GET", path=q, bearer=access_token, timeout_s=30)
+            if r.status_code != 200 or not isinstance(r.body_json, dict):
+                return []
+            data = r.body_json.get("data")
+            if isinstance(data, list):
+                return [e for e in data if isinstance(e, dict)]
+            return []
+
+        def log_id(entry: dict[str, Any]) -> int:
+            v = entry.get("id")
+            return v if isinstance(v, int) else 0
+
+        # --- fixture + isolation ---
+        prefix = f"biz3_{run_stamp}"
+        provider_a = f"{prefix}_provider"
+        provider_b = f"{prefix}_provider_b"
+        client_token_name = f"{prefix}_clienttoken"
+
+        disabled_keys: dict[str, list[str]] = {}
+        cleanup_notes: list[str] = []
+
+        def cleanup_note(desc: str, fn) -> str:
+            try:
+                ok = bool(fn())
+                return f"- {desc}：{'OK' if ok else 'SKIP/IGNORED'}"
+            except Exception as exc:
+                return f"- {desc}：FAIL（{redact_text(str(exc))}）"
+
+        def cleanup_step(desc: str, fn) -> None:
+            cleanup_notes.append(cleanup_note(desc, fn))
+
+        # Select a source provider/key from DB (fallback when .env doesn't have upstream keys).
+        providers = list_providers()
+        source_provider = ""
+        for p in providers:
+            name = str(p.get("name") or "")
+            keys = p.get("api_keys") or []
+            if name and isinstance(keys, list) and keys:
+                source_provider = name
+                break
+
+        source_keys: list[str] = []
+        source_meta: dict[str, Any] | None = None
+        if source_provider:
+            # Both lookups are independent; issue them together.
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                keys_fut = pool.submit(provider_keys_raw, source_provider)
+                meta_fut = pool.submit(get_provider, source_provider)
+                source_keys = keys_fut.result()
+                source_meta = meta_fut.result()
+        key1 = (_pick_fast(cfg_ci, ["UPSTREAM_API_KEY_1", "UPSTREAM_API_KEY1", "PROVIDER_API_KEY_1", "PROVIDER_API_KEY1"]) or "").strip()
+        key2 = (_pick_fast(cfg_ci, ["UPSTREAM_API_KEY_2", "UPSTREAM_API_KEY2", "PROVIDER_API_KEY_2", "PROVIDER_API_KEY2"]) or "").strip()
+        if not key1 and source_keys:
+            key1 = source_keys[0]
+        if not key2 and len(source_keys) >= 2:
+            key2 = source_keys[1]
+        has_two_keys = bool(key1 and key2)
+        key1_mask = mask_key_local(key1)
+        key2_mask = mask_key_local(key2) if key2 else ""
+
+        api_type = (_pick_fast(cfg_ci, ["PROVIDER_API_TYPE", "UPSTREAM_API_TYPE", "API_TYPE"]) or "").strip().lower()
+        upstream_base_url = (_pick_fast(cfg_ci, ["UPSTREAM_BASE_URL", "PROVIDER_BASE_URL", "OPENAI_BASE_URL", "BASEURL", "BASE_URL"]) or "").strip()
+        if not api_type and isinstance((source_meta or {}).get("api_type"), str):
+            api_type = str(source_meta["api_type"]).strip().lower()
+        if not upstream_base_url and isinstance((source_meta or {}).get("base_url"), str):
+            upstream_base_url = str(source_meta["base_url"]).strip()
+        upstream_base_url, note = run_biz.normalize_provider_base_url(api_type=api_type or "openai", base_url=upstream_base_url)
+
+        log(f"fixture_provider_a: {provider_a}")
+        log(f"fixture_provider_b: {provider_b}")
+        log(f"source_provider_for_keys: {source_provider or '(none)'} keys_found={len(source_keys)}")
+        log(f"upstream_api_type: {api_type or '(unset)'}")
+        log(f"upstream_base_url: {mask_secret(upstream_base_url, keep=12)}" + (f" ({note})" if note else ""))
+        log(f"key1: <REDACTED {mask_secret(key1, keep=0)}>")
+        log(f"key2: <REDACTED {mask_secret(key2, keep=0)}>")
+
+        if not upstream_base_url or not key1:
+            msg = "FATAL: 缺少上游 base_url 或 key（需在 .env 配置，或 DB 中存在至少 1 个 provider key 供复用）"
+            write_report_atomic(report_path, msg + "\n")
             log(msg)
-            # best-effort restore
-            for n, ks in disabled_keys.items():
-                _ = add_keys_batch(n, ks)
-            append_workflow_record_biz3(report_path=report_path, ok=False)
+            append_workflow_record_biz3(report_path=report_path, ok=False, stamp=run_dt_iso)
             return 2
 
-    backend_proc: subprocess.Popen[bytes] | None = None
-    original_custom = CUSTOM_CONFIG.read_text(encoding="utf-8", errors="replace") if CUSTOM_CONFIG.exists() else ""
+        # Isolate by temporarily removing keys from non-biz3 providers with keys.
+        isolate_names: list[str] = []
+        for p in providers:
+            name = str(p.get("name") or "")
+            if not name or name.startswith(prefix):
+                continue
+            keys = p.get("api_keys") or []
+            if not isinstance(keys, list) or not keys:
+                continue
+            isolate_names.append(name)
+        if isolate_names:
+            # No bulk "keys included" endpoint exists, so fetch the raw keys concurrently.
+            with ThreadPoolExecutor(max_workers=min(8, len(isolate_names))) as pool:
+                for name, raw in zip(isolate_names, pool.map(provider_keys_raw, isolate_names)):
+                    if raw:
+                        disabled_keys[name] = raw
 
-    phases = [("round_robin", 8), ("random", 20), ("first_available", 5)]
-    phase_rows: dict[str, list[LbRow]] = {}
-    phase_ok: dict[str, bool] = {}
-    phase_notes: dict[str, str] = {}
+        for name, keys in disabled_keys.items():
+            ok = delete_keys_batch(name, keys)
+            log(f"isolation_disable_keys: provider={name} keys={len(keys)} ok={ok}")
+            if not ok:
+                msg = "FATAL: 无法完成隔离（删除非 biz3 providers keys 失败），请手工清理后重试"
+                write_report_atomic(report_path, msg + "\n")
+                log(msg)
+                # best-effort restore
+                for n, ks in disabled_keys.items():
+                    _ = add_keys_batch(n, ks)
+                append_workflow_record_biz3(report_path=report_path, ok=False, stamp=run_dt_iso)
+                return 2
+
+        backend_proc: subprocess.Popen[bytes] | None = None
+        # Set once the phase loop touches custom-config.toml or the backend; until then the
+        # original backend is still serving the original config and cleanup can reuse it.
+        backend_restarted = False
+        original_custom = CUSTOM_CONFIG.read_text(encoding="utf-8", errors="replace") if CUSTOM_CONFIG.exists() else ""
+
+        phases = [("round_robin", 8), ("random", 20), ("first_available", 5)]
+        phase_rows: dict[str, list[LbRow]] = {}
+        phase_ok: dict[str, bool] = {}
+        phase_notes: dict[str, str] = {}
 
-    try:
-        # Create providers + keys
-        if not create_provider(name=provider_a, api_type=api_type or "openai", upstream_base_url=upstream_base_url):
-            raise RuntimeError("create provider_a failed")
-        if not create_provider(name=provider_b, api_type=api_type or "openai", upstream_base_url=upstream_base_url):
-            raise RuntimeError("create provider_b failed")
-        if not add_key(provider_a, key1):
-            raise RuntimeError("add key1 to provider_a failed")
-        if not add_key(provider_b, key1):
-            raise RuntimeError("add key1 to provider_b failed")
-        if has_two_keys and not add_key(provider_a, key2):
-            raise RuntimeError("add key2 to provider_a failed")
-
-        model_ids = refresh_models(provider_a)
-        model_id = ""
-        if model_ids:
-            prefer = run_biz.pick(cfg, ["BIZ_TEST_MODEL", "TEST_MODEL", "OPENAI_MODEL", "MODEL", "CHAT_MODEL"]).strip()
-            model_id = run_biz.pick_model_id(model_ids, prefer=prefer)
-        if not model_id:
-            model_id = "gpt-4o-mini"
-            log("WARN: refresh models failed/empty; fallback model=gpt-4o-mini (upstream-dependent)")
-
-        if not update_cache_selected(provider_a, model_id):
-            raise RuntimeError("update cache provider_a failed")
-        if not update_cache_selected(provider_b, model_id):
-            raise RuntimeError("update cache provider_b failed")
-        if not upsert_price(provider_a, model_id):
-            raise RuntimeError("upsert price provider_a failed")
-        if not upsert_price(provider_b, model_id):
-            raise RuntimeError("upsert price provider_b failed")
-
-        client_token = create_client_token(client_token_name)
-        if not client_token:
-            raise RuntimeError("create client token failed")
-        log(f"client_token: <REDACTED {run_biz.mask_secret(client_token, keep=0)}>")
-
-        provider_order = sorted([provider_a, provider_b])
-        p0, p1 = provider_order[0], provider_order[1]
-
-        for strategy, n in phases:
-            log(f"== phase strategy={strategy} n={n} ==")
-            if not CUSTOM_CONFIG.exists():
-                raise RuntimeError("custom-config.toml missing; cannot switch strategy for runtime verification")
-            rewrite_custom_config_strategy(CUSTOM_CONFIG, strategy=strategy)
-
-            # restart backend to apply config
-            if backend_proc is not None and backend_proc.poll() is None:
-                backend_proc.terminate()
-                try:
-                    backend_proc.wait(timeout=10)
-                except subprocess.TimeoutExpired:
-                    backend_proc.kill()
-            stop_by_port(8080, timeout_s=10)
-            server_log_path.write_bytes(b"")
-            backend_proc = start_backend(server_log_path)
-            ok_ready, _out = wait_ready_with_proc(backend_proc, base_url, server_log_path, timeout_s=180)
-            if not ok_ready:
-                raise RuntimeError(
-                    f"backend not ready after restart (strategy={strategy}); server_log={server_log_path}"
-                )
+        try:
+            def run_setup_steps(steps: list[tuple[str, Any]]) -> None:
+                # Independent setup calls run concurrently; the first failure (in list order) is raised.
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    futures = [(desc, pool.submit(fn)) for desc, fn in steps]
+                    for desc, fut in futures:
+                        if not fut.result():
+                            raise RuntimeError(f"{desc} failed")
+
+            def add_keys_to_provider_a() -> bool:
+                # Key order on provider_a is what the per-strategy key checks expect, so keep it sequential.
+                if not add_key(provider_a, key1):
+                    return False
+                return not has_two_keys or add_key(provider_a, key2)
+
+            # Create providers + keys
+            api_type_or_default = api_type or "openai"
+            run_setup_steps(
+                [
+                    ("create provider_a", lambda: create_provider(name=provider_a, api_type=api_type_or_default, upstream_base_url=upstream_base_url)),
+                    ("create provider_b", lambda: create_provider(name=provider_b, api_type=api_type_or_default, upstream_base_url=upstream_base_url)),
+                ]
+            )
+            run_setup_steps(
+                [
+                    ("add keys to provider_a", add_keys_to_provider_a),
+                    ("add key1 to provider_b", lambda: add_key(provider_b, key1)),
+                ]
+            )
+
+            model_ids = refresh_models(provider_a)
+            model_id = ""
+            if model_ids:
+                prefer = _pick_fast(cfg_ci, ["BIZ_TEST_MODEL", "TEST_MODEL", "OPENAI_MODEL", "MODEL", "CHAT_MODEL"]).strip()
+                model_id = run_biz.pick_model_id(model_ids, prefer=prefer)
+            if not model_id:
+                model_id = "gpt-4o-mini"
+                log("WARN: refresh models failed/empty; fallback model=gpt-4o-mini (upstream-dependent)")
+
+            run_setup_steps(
+                [
+                    ("update cache provider_a", lambda: update_cache_selected(provider_a, model_id)),
+                    ("update cache provider_b", lambda: update_cache_selected(provider_b, model_id)),
+                    ("upsert price provider_a", lambda: upsert_price(provider_a, model_id)),
+                    ("upsert price provider_b", lambda: upsert_price(provider_b, model_id)),
+                ]
+            )
 
-            rows: list[LbRow] = []
-            for i in range(1, n + 1):
-                status = chat_once(client_token=client_token, model_id=model_id)
-                entry: dict[str, Any] | None = None
-                for _ in range(8):
-                    entry = latest_chat_log(client_token=client_token, model_id=model_id)
-                    if entry is not None:
-                        break
-                    time.sleep(0.2)
-                provider_used = str((entry or {}).get("provider") or "") or "(unknown)"
-                api_key_used_raw = str((entry or {}).get("api_key") or "")
-                # Always mask locally to prevent accidental leakage when server is configured as key_log_strategy=plain.
-                api_key_used = mask_key_local(api_key_used_raw)
-                rt_ms = int((entry or {}).get("response_time_ms") or 0)
-                rows.append(LbRow(i=i, http_status=status, rt_ms=rt_ms, provider=provider_used, api_key_hint=api_key_used))
-                log(f"req#{i} status={status} provider={provider_used} api_key={api_key_used} rt_ms={rt_ms}")
-
-            providers_seen = [r.provider for r in rows]
-            provider_ok = True
-            if strategy == "first_available":
-                provider_ok = all(p == p0 for p in providers_seen)
-            elif strategy == "random":
-                provider_ok = (p0 in providers_seen) and (p1 in providers_seen)
-            elif strategy == "round_robin":
-                expected = [p0 if (k % 2 == 0) else p1 for k in range(n)]
-                provider_ok = providers_seen == expected
-
-            key_note = "key_check=SKIP(no_key2)"
-            key_ok = True
-            if has_two_keys:
-                key_note = "key_check=PASS"
-                # Provider B only has key1.
-                key_seq_b = [r.api_key_hint for r in rows if r.provider == provider_b]
-                if any(k != key1_mask for k in key_seq_b):
-                    key_ok = False
-                    key_note = "key_check=FAIL(provider_b_expected_key1)"
-
-                # Provider A has key1+key2; verify per-strategy behavior on its own subsequence.
-                key_seq_a = [r.api_key_hint for r in rows if r.provider == provider_a]
+            client_token = create_client_token(client_token_name)
+            if not client_token:
+                raise RuntimeError("create client token failed")
+            log(f"client_token: <REDACTED {mask_secret(client_token, keep=0)}>")
+
+            provider_order = sorted([provider_a, provider_b])
+            p0, p1 = provider_order[0], provider_order[1]
+
+            for strategy, n in phases:
+                log(f"== phase strategy={strategy} n={n} ==")
+                if not CUSTOM_CONFIG.exists():
+                    raise RuntimeError("custom-config.toml missing; cannot switch strategy for runtime verification")
+                backend_restarted = True
+                rewrite_custom_config_strategy(CUSTOM_CONFIG, strategy=strategy)
+
+                statuses: list[int] = []
+                entries: list[dict[str, Any] | None] = []
+                # "burst": fire all n requests, then correlate against one window of request logs.
+                # "per_request": replay from a fresh backend, looking up each request's log right after it.
+                for mode in ("burst", "per_request"):
+                    # restart backend to apply config (and reset strategy state before a replay)
+                    if backend_proc is not None:
+                        _terminate_fast(backend_proc)
+                    stop_by_port(8080, timeout_s=10)
+                    _truncate_log(server_log_path)
+                    backend_proc = start_backend(server_log_path)
+                    ok_ready, _out = wait_ready_with_proc(backend_proc, base_url, server_log_path, timeout_s=180)
+                    if not ok_ready:
+                        raise RuntimeError(
+                            f"backend not ready after restart (strategy={strategy}); server_log={server_log_path}"
+                        )
+
+                    before = recent_chat_logs(client_token=client_token, model_id=model_id, limit=1)
+                    watermark = log_id(before[0]) if before else 0
+                    if mode == "burst":
+                        # Entries newer than the pre-burst watermark, in id order, map 1:1 to requests.
+                        statuses = [chat_once(client_token=client_token, model_id=model_id) for _ in range(n)]
+                        window: list[dict[str, Any]] = []
+                        log_deadline = time.time() + 1.6
+                        delay = 0.05
+                        while True:
+                            window = [
+                                e
+                                for e in recent_chat_logs(client_token=client_token, model_id=model_id, limit=n * 2)
+                                if log_id(e) > watermark
+                            ]
+                            if len(window) >= n or time.time() >= log_deadline:
+                                break
+                            time.sleep(delay)
+                            delay = min(delay * 1.5, 0.2)
+                        if len(window) == n:
+                            window.sort(key=log_id)
+                            entries = list(window)
+                            break
+                        log(
+                            f"WARN: request log window has {len(window)} entries for {n} requests; "
+                            "replaying the phase with a per-request log lookup"
+                        )
+                        continue
+
+                    statuses = []
+                    entries = []
+                    for _ in range(n):
+                        statuses.append(chat_once(client_token=client_token, model_id=model_id))
+                        entry: dict[str, Any] | None = None
+                        log_deadline = time.time() + 1.6
+                        delay = 0.05
+                        while True:
+                            latest = recent_chat_logs(client_token=client_token, model_id=model_id, limit=1)
+                            if latest and log_id(latest[0]) > watermark:
+                                entry = latest[0]
+                                watermark = log_id(entry)
+                                break
+                            if time.time() >= log_deadline:
+                                break
+                            time.sleep(delay)
+                            delay = min(delay * 1.5, 0.2)
+                        entries.append(entry)
+
+                rows: list[LbRow] = []
+                for i, (status, entry) in enumerate(zip(statuses, entries), start=1):
+                    provider_used = str((entry or {}).get("provider") or "") or "(unknown)"
+                    api_key_used_raw = str((entry or {}).get("api_key") or "")
+                    # Always mask locally to prevent accidental leakage when server is configured as key_log_strategy=plain.
+                    api_key_used = mask_key_local(api_key_used_raw)
+                    rt_ms = int((entry or {}).get("response_time_ms") or 0)
+                    rows.append(LbRow(i=i, http_status=status, rt_ms=rt_ms, provider=provider_used, api_key_hint=api_key_used))
+                    log(f"req#{i} status={status} provider={provider_used} api_key={api_key_used} rt_ms={rt_ms}")
+
+                providers_seen = [r.provider for r in rows]
+                provider_ok = True
                 if strategy == "first_available":
-                    if any(k != key1_mask for k in key_seq_a):
-                        key_ok = False
-                        key_note = "key_check=FAIL(first_available_expected_key1)"
-                elif strategy == "round_robin":
-                    expected_a = [key1_mask if (i % 2 == 0) else key2_mask for i in range(len(key_seq_a))]
-                    if key_seq_a != expected_a:
-                        key_ok = False
-                        key_note = "key_check=FAIL(round_robin_expected_alternating)"
+                    provider_ok = all(p == p0 for p in providers_seen)
                 elif strategy == "random":
-                    # Random: only assert both keys appear when provider_a hit enough times.
-                    if len(key_seq_a) >= 8 and (key1_mask not in key_seq_a or key2_mask not in key_seq_a):
+                    provider_ok = (p0 in providers_seen) and (p1 in providers_seen)
+                elif strategy == "round_robin":
+                    expected = [p0 if (k % 2 == 0) else p1 for k in range(n)]
+                    provider_ok = providers_seen == expected
+
+                key_note = "key_check=SKIP(no_key2)"
+                key_ok = True
+                if has_two_keys:
+                    key_note = "key_check=PASS"
+                    # Provider B only has key1.
+                    key_seq_b = [r.api_key_hint for r in rows if r.provider == provider_b]
+                    if any(k != key1_mask for k in key_seq_b):
                         key_ok = False
-                        key_note = "key_check=FAIL(random_expected_both_keys)"
-                    elif len(key_seq_a) < 8:
-                        key_note = f"key_check=SKIP(provider_a_hits={len(key_seq_a)})"
-
-            ok = provider_ok and key_ok
-            phase_ok[strategy] = ok
-            phase_rows[strategy] = rows
-            phase_notes[strategy] = f"provider_check={'PASS' if provider_ok else 'FAIL'}; {key_note}"
-            log(f"phase_result: strategy={strategy} ok={ok} {phase_notes[strategy]}")
-
-        pass_count = sum(1 for v in phase_ok.values() if v)
-        fail_count = len(phase_ok) - pass_count
-
-        report_lines: list[str] = []
-        report_lines.append("# biz3 负载均衡（多 Key / 多 Provider）业务验证报告\n\n")
-        report_lines.append(f"- time_utc: `{run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}`\n")
-        report_lines.append(f"- base_url: `{base_url}`\n")
-        report_lines.append(f"- git_sha: `{git_sha_short()}`\n")
-        report_lines.append(f"- strategies_tested: `{', '.join([s for s, _ in phases])}`\n")
-        report_lines.append(f"- provider_fixture_a: `{provider_a}`\n")
-        report_lines.append(f"- provider_fixture_b: `{provider_b}`\n")
-        report_lines.append(f"- isolated_other_providers: `{bool(disabled_keys)}`\n")
-        report_lines.append(f"- upstream_api_type: `{api_type or '(unset)'}`\n")
-        report_lines.append(f"- upstream_base_url: `<REDACTED {run_biz.mask_secret(upstream_base_url, keep=12)}>`\n")
-        report_lines.append(f"- model: `{model_id}`\n")
-        report_lines.append(f"- multi_key_count(provider_a): `{2 if has_two_keys else 1}`\n")
-        report_lines.append("- observable_signal: `GET /admin/logs/requests` 字段 `provider` + `api_key`（按 key_log_strategy 输出 masked/plain/none）\n")
-        if not has_two_keys:
-            report_lines.append("\n> NOTE: 当前环境缺少第二把上游 key（.env 未配置且 DB 仅 1 把），因此本次仅覆盖 **多 Provider** 的策略验证；多 Key 行为无法做真实运行时断言。\n")
-        report_lines.append("\n")
-
-        for strategy, _n in phases:
-            ok = phase_ok.get(strategy, False)
-            report_lines.append(f"## {strategy}\n\n")
-            report_lines.append(f"- result: **{'PASS' if ok else 'FAIL'}**\n\n")
-            if strategy in phase_notes:
-                report_lines.append(f"- checks: `{phase_notes[strategy]}`\n\n")
-            report_lines.append("| # | HTTP | rt_ms | provider | api_key(masked) |\n")
-            report_lines.append("|---:|---:|---:|---|---|\n")
-            for r in phase_rows.get(strategy, []):
-                report_lines.append(f"| {r.i} | {r.http_status} | {r.rt_ms} | `{r.provider}` | `{r.api_key_hint}` |\n")
-            report_lines.append("\n")
-
-        report_lines.append("## 汇总\n\n")
-        report_lines.append(f"- Pass={pass_count} / Fail={fail_count} / Total={len(phases)}\n")
-        report_lines.append(f"- 结论：**{'Pass' if fail_count == 0 else 'Fail'}**\n\n")
-
-        report_lines.append("## Cleanup\n\n")
-        report_lines.extend([line + "\n" for line in cleanup_notes] if cleanup_notes else ["- (none)\n"])
-
-        report_lines.append("\n## 自我评估\n\n")
-        report_lines.append("- 是否泄露敏感信息：脚本对 JWT/provider keys/client token 做脱敏；报告包含泄露自检\n")
-        report_lines.append("- 可重复执行/数据污染：fixture provider 做 best-effort 删除；非 biz3 providers keys 做临时移除并尽力恢复\n")
-        report_lines.append("- 费用控制：chat max_tokens=1；price=0 仅影响网关计费统计，不影响上游实际计费\n")
-        report_lines.append("- 兼容性：本脚本只走管理/业务接口，不改动对外 API\n")
-
-        report_text = run_biz.redact_text("".join(report_lines))
-        try:
-            run_biz.assert_no_secret_leak(report_text, where=str(report_path))
-        except Exception as exc:
-            report_text += f"\n\nFATAL: redaction self-check failed: {exc}\n"
-        report_path.write_text(report_text, encoding="utf-8")
-        append_workflow_record_biz3(report_path=report_path, ok=(fail_count == 0))
-
-        sys.stdout.write(
-            f"{'Pass' if fail_count == 0 else 'Fail'}: report={report_path.relative_to(ROOT_DIR).as_posix()} log={log_path.relative_to(ROOT_DIR).as_posix()}\n"
-        )
-        return 0 if fail_count == 0 else 1
-
-    except Exception as exc:
-        msg = f"FATAL: {exc}"
-        report_path.write_text(run_biz.redact_text(msg) + "\n", encoding="utf-8")
-        log(msg)
-        append_workflow_record_biz3(report_path=report_path, ok=False)
-        return 2
-
-    finally:
-        # Restore config first, then ensure backend is up for cleanup calls.
-        if original_custom and CUSTOM_CONFIG.exists():
+                        key_note = "key_check=FAIL(provider_b_expected_key1)"
+
+                    # Provider A has key1+key2; verify per-strategy behavior on its own subsequence.
+                    key_seq_a = [r.api_key_hint for r in rows if r.provider == provider_a]
+                    if strategy == "first_available":
+                        if any(k != key1_mask for k in key_seq_a):
+                            key_ok = False
+                            key_note = "key_check=FAIL(first_available_expected_key1)"
+                    elif strategy == "round_robin":
+                        expected_a = [key1_mask if (i % 2 == 0) else key2_mask for i in range(len(key_seq_a))]
+                        if key_seq_a != expected_a:
+                            key_ok = False
+                            key_note = "key_check=FAIL(round_robin_expected_alternating)"
+                    elif strategy == "random":
+                        # Random: only assert both keys appear when provider_a hit enough times.
+                        if len(key_seq_a) >= 8 and (key1_mask not in key_seq_a or key2_mask not in key_seq_a):
+                            key_ok = False
+                            key_note = "key_check=FAIL(random_expected_both_keys)"
+                        elif len(key_seq_a) < 8:
+                            key_note = f"key_check=SKIP(provider_a_hits={len(key_seq_a)})"
+
+                ok = provider_ok and key_ok
+                phase_ok[strategy] = ok
+                phase_rows[strategy] = rows
+                phase_notes[strategy] = f"provider_check={'PASS' if provider_ok else 'FAIL'}; {key_note}"
+                log(f"phase_result: strategy={strategy} ok={ok} {phase_notes[strategy]}")
+
+            pass_count = sum(1 for v in phase_ok.values() if v)
+            fail_count = len(phase_ok) - pass_count
+
+            # CI fast path: callers that only need the exit code can skip the Markdown report on success.
+            if no_report and fail_count == 0:
+                write_report_atomic(report_path, f"Pass: {pass_count}/{len(phases)}\n")
+                append_workflow_record_biz3(report_path=report_path, ok=True, stamp=run_dt_iso)
+                sys.stdout.write(f"Pass: report={run_biz.root_relative(report_path)} log={run_biz.root_relative(log_path)}\n")
+                return 0
+
+            report_buf = io.StringIO()
+            # Only the header carries config/server-sourced values (base_url, model, api_type), so redact it
+            # here; rows hold locally masked keys and cleanup notes are redacted when recorded.
+            report_buf.write(
+                redact_text(
+                    f"""# biz3 负载均衡（多 Key / 多 Provider）业务验证报告
+
+- time_utc: `{run_dt_iso}`
+- base_url: `{base_url}`
+- git_sha: `{git_sha_short()}`
+- strategies_tested: `{', '.join([s for s, _ in phases])}`
+- provider_fixture_a: `{provider_a}`
+- provider_fixture_b: `{provider_b}`
+- isolated_other_providers: `{bool(disabled_keys)}`
+- upstream_api_type: `{api_type or '(unset)'}`
+- upstream_base_url: `<REDACTED {mask_secret(upstream_base_url, keep=12)}>`
+- model: `{model_id}`
+- multi_key_count(provider_a): `{2 if has_two_keys else 1}`
+- observable_signal: `GET /admin/logs/requests` 字段 `provider` + `api_key`（按 key_log_strategy 输出 masked/plain/none）
+"""
+                )
+            )
+            if not has_two_keys:
+                report_buf.write("\n> NOTE: 当前环境缺少第二把上游 key（.env 未配置且 DB 仅 1 把），因此本次仅覆盖 **多 Provider** 的策略验证；多 Key 行为无法做真实运行时断言。\n")
+            report_buf.write("\n")
+
+            for strategy, _n in phases:
+                ok = phase_ok.get(strategy, False)
+                note = phase_notes.get(strategy)
+                strategy_rows = phase_rows.get(strategy, ())
+                report_buf.write(f"## {strategy}\n\n")
+                report_buf.write(f"- result: **{'PASS' if ok else 'FAIL'}**\n\n")
+                if note is not None:
+                    report_buf.write(f"- checks: `{note}`\n\n")
+                report_buf.write("| # | HTTP | rt_ms | provider | api_key(masked) |\n")
+                report_buf.write("|---:|---:|---:|---|---|\n")
+                rows_md = "\n".join(r.md_row for r in strategy_rows)
+                report_buf.write(rows_md + "\n\n" if rows_md else "\n")
+
+            report_buf.write("## 汇总\n\n")
+            report_buf.write(f"- Pass={pass_count} / Fail={fail_count} / Total={len(phases)}\n")
+            report_buf.write(f"- 结论：**{'Pass' if fail_count == 0 else 'Fail'}**\n\n")
+
+            report_buf.write(_CLEANUP_HEADER)
+            if cleanup_notes:
+                report_buf.write("\n".join(cleanup_notes))
+                report_buf.write("\n")
+            else:
+                report_buf.write("- (none)\n")
+
+            report_buf.write(_SELF_ASSESS_BLOCK)
+
+            report_text = report_buf.getvalue()
             try:
-                CUSTOM_CONFIG.write_text(original_custom, encoding="utf-8")
-            except Exception:
-                pass
+                assert_no_secret_leak(report_text, where=str(report_path))
+            except Exception as exc:
+                report_text += f"\n\nFATAL: redaction self-check failed: {exc}\n"
+            write_report_atomic(report_path, report_text)
+            append_workflow_record_biz3(report_path=report_path, ok=(fail_count == 0), stamp=run_dt_iso)
+
+            sys.stdout.write(
+                f"{'Pass' if fail_count == 0 else 'Fail'}: report={run_biz.root_relative(report_path)} log={run_biz.root_relative(log_path)}\n"
+            )
+            return 0 if fail_count == 0 else 1
 
-        if backend_proc is not None and backend_proc.poll() is None:
-            try:
-                backend_proc.terminate()
-                backend_proc.wait(timeout=10)
-            except Exception:
+        except Exception as exc:
+            msg = f"FATAL: {exc}"
+            write_report_atomic(report_path, redact_text(msg) + "\n")
+            log(msg)
+            append_workflow_record_biz3(report_path=report_path, ok=False, stamp=run_dt_iso)
+            return 2
+
+        finally:
+            # Restore config first, then ensure backend is up for cleanup calls.
+            if original_custom and CUSTOM_CONFIG.exists():
                 try:
-                    backend_proc.kill()
+                    CUSTOM_CONFIG.write_text(original_custom, encoding="utf-8")
                 except Exception:
                     pass
-        stop_by_port(8080, timeout_s=10)
-        try:
-            server_log_path.write_bytes(b"")
-            backend_proc = start_backend(server_log_path)
-            _ok, _out = wait_ready_with_proc(backend_proc, base_url, server_log_path, timeout_s=240)
-        except Exception:
-            pass
 
-        # Restore disabled keys
-        for name, keys in disabled_keys.items():
-            cleanup_step(
-                f"恢复 provider keys provider={name} count={len(keys)}",
-                lambda n=name, ks=keys: add_keys_batch(n, ks),
-            )
+            if backend_restarted:
+                if backend_proc is not None:
+                    try:
+                        _terminate_fast(backend_proc)
+                    except Exception:
+                        pass
+                stop_by_port(8080, timeout_s=10)
+                try:
+                    _truncate_log(server_log_path)
+                    backend_proc = start_backend(server_log_path)
+                    _ok, _out = wait_ready_with_proc(backend_proc, base_url, server_log_path, timeout_s=240)
+                except Exception:
+                    pass
 
-        # Delete fixture providers
-        cleanup_step(f"删除 fixture provider_b={provider_b}", lambda: delete_provider(provider_b))
-        cleanup_step(f"删除 fixture provider_a={provider_a}", lambda: delete_provider(provider_a))
+            # Restore disabled keys (distinct providers, so the calls run concurrently; notes keep input order).
+            restore_tasks = [
+                (f"恢复 provider keys provider={name} count={len(keys)}", lambda n=name, ks=keys: add_keys_batch(n, ks))
+                for name, keys in disabled_keys.items()
+            ]
+            if restore_tasks:
+                with ThreadPoolExecutor(max_workers=min(8, len(restore_tasks))) as pool:
+                    cleanup_notes.extend(pool.map(lambda t: cleanup_note(*t), restore_tasks))
+
+            # Delete fixture providers
+            cleanup_step(f"删除 fixture provider_b={provider_b}", lambda: delete_provider(provider_b))
+            cleanup_step(f"删除 fixture provider_a={provider_a}", lambda: delete_provider(provider_a))
 
 
 if __name__ == "__main__":
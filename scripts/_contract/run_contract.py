@@ -1,24 +1,31 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import base64
+import functools
 import json
 import os
 import re
 import secrets
 import subprocess
 import sys
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 OPENAPI_PATH = ROOT_DIR / "openapi.yaml"
 
 
-SENSITIVE_JSON_KEYS = {
+SENSITIVE_JSON_KEYS = frozenset({
     "authorization",
     "accesstoken",
     "refreshtoken",
@@ -32,7 +39,7 @@ SENSITIVE_JSON_KEYS = {
     "provider_key",
     # `/providers/{provider}/keys/raw` contains plaintext key under `value`
     "value",
-}
+})
 
 
 def utc_now() -> datetime:
@@ -40,65 +47,94 @@ def utc_now() -> datetime:
 
 
 def utc_compact_timestamp(dt: datetime) -> str:
-    return dt.strftime("%Y%m%dT%H%M%SZ")
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}T{dt.hour:02d}{dt.minute:02d}{dt.second:02d}Z"
 
 
 def mask_secret(value: str | None, keep: int = 8) -> str:
-    s = value or ""
-    n = len(s)
-    if n == 0:
+    if not value:
         return "(empty)"
+    n = len(value)
     if n <= keep:
-        return f"{s[:1]}…(len={n})"
-    return f"{s[:keep]}…(len={n})"
+        return f"{value[:1]}…(len={n})"
+    return f"{value[:keep]}…(len={n})"
 
 
-def redact_bearer(text: str) -> str:
-    text = re.sub(r"(?i)(Authorization:\s*Bearer)\s+([^\s]+)", r"\1 ***REDACTED***", text)
-    text = re.sub(r"(?i)\\bBearer\\s+([A-Za-z0-9._+/=\\-]+)\\b", "Bearer ***REDACTED***", text)
-    return text
+_BEARER_HDR_RE = re.compile(r"(Authorization:\s*Bearer)\s+(\S+)", re.IGNORECASE)
+# Cheap prefilter: every bearer pattern needs the (case-insensitive) literal "bearer".
+_BEARER_PROBE_RE = re.compile("bearer", re.IGNORECASE)
+# Bare-bearer | JSON-secret, applied after _BEARER_HDR_RE (same split as run_rbac.py, which explains why).
+_REDACT_RE = re.compile(
+    r"\bBearer\s+[A-Za-z0-9._+/=\-]+\b"
+    r'|"(?P<jkey>refreshToken|accessToken|password|token|key|value)"\s*:\s*"[^"]+"',
+    re.IGNORECASE,
+)
+
+
+def _redact_match(m: re.Match[str]) -> str:
+    jkey = m.group("jkey")
+    if jkey is not None:
+        return f"\"{jkey}\": \"***REDACTED***\""
+    return "Bearer ***REDACTED***"
 
 
 def redact_text(text: str) -> str:
-    text = redact_bearer(text)
-    # Redact common JSON fields carrying secrets (keep it heuristic & safe).
-    text = re.sub(
-        r'(?i)"(refreshToken|accessToken|password|token|key|value)"\s*:\s*"[^"]+"',
-        lambda m: f"\"{m.group(1)}\": \"***REDACTED***\"",
-        text,
-    )
-    return text
+    # The JSON-secret branch needs a quote and the bearer ones "bearer"; most log lines have neither.
+    if '"' not in text and _BEARER_PROBE_RE.search(text) is None:
+        return text
+    text = _BEARER_HDR_RE.sub(r"\1 ***REDACTED***", text)
+    # Redact bare bearer tokens and common JSON fields carrying secrets (keep it heuristic & safe).
+    return _REDACT_RE.sub(_redact_match, text)
 
 
 def redact_json(value: Any) -> Any:
     if isinstance(value, dict):
         out: dict[str, Any] = {}
+        # Keys from json.loads are always str.
         for k, v in value.items():
-            if str(k).lower() in SENSITIVE_JSON_KEYS:
-                if isinstance(v, str):
-                    out[k] = f"***REDACTED*** (len={len(v)})"
-                else:
-                    out[k] = "***REDACTED***"
-            else:
+            if k.lower() not in SENSITIVE_JSON_KEYS:
                 out[k] = redact_json(v)
+            elif isinstance(v, str):
+                out[k] = f"***REDACTED*** (len={len(v)})"
+            else:
+                out[k] = "***REDACTED***"
         return out
     if isinstance(value, list):
         return [redact_json(v) for v in value]
     return value
 
 
+def redact_json_inplace(value: Any) -> Any:
+    # Same redaction as redact_json, but rewrites the (caller-owned) containers instead of copying them.
+    if isinstance(value, dict):
+        for k, v in value.items():
+            if k.lower() not in SENSITIVE_JSON_KEYS:
+                redact_json_inplace(v)
+            else:
+                value[k] = f"***REDACTED*** (len={len(v)})" if isinstance(v, str) else "***REDACTED***"
+    elif isinstance(value, list):
+        for v in value:
+            redact_json_inplace(v)
+    return value
+
+
 def parse_env_file(path: Path) -> dict[str, str]:
     if not path.exists():
         return {}
     env: dict[str, str] = {}
     for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.rstrip("\r")
-        if not line.strip() or line.lstrip().startswith("#"):
+        line = raw.rstrip("\r").lstrip()
+        if not line or line[0] == "#":
             continue
-        m = re.match(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*([=:])\s*(.*)\s*$", line)
-        if not m:
+        # KEY=value / KEY: value; the first '=' or ':' is the separator (neither can appear in KEY).
+        eq = line.find("=")
+        colon = line.find(":")
+        sep = colon if eq < 0 or (0 <= colon < eq) else eq
+        if sep < 0:
             continue
-        key, _sep, val = m.group(1), m.group(2), m.group(3)
+        key = line[:sep].rstrip()
+        if not (key.isascii() and key.isidentifier()):
+            continue
+        val = line[sep + 1 :].lstrip()
         if val.startswith('"') and val.endswith('"') and len(val) >= 2:
             val = val[1:-1]
         env[key] = val
@@ -123,6 +159,77 @@ def run_cmd(cmd: list[str], *, timeout_s: int = 30) -> subprocess.CompletedProce
     return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s)
 
 
+def json_dumps(value: Any) -> str:
+    # Non-ASCII stays readable in snippets (orjson always emits UTF-8).
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False)
+
+
+def json_loads(text: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Complete strings, a lone `"` (a string cut off by the size cap) and the structural characters.
+_JSON_PREFIX_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|"|[\[\]{},]', re.DOTALL)
+
+
+def parse_json_prefix(text: str) -> Any:
+    # Parses a JSON document that was cut off at an arbitrary point: the text is cut back to the last
+    # complete member/item and the containers still open there are closed. Raises ValueError if nothing is left.
+    text = text.lstrip()
+    if not text.startswith(("{", "[")):
+        raise ValueError("not a JSON object or array")
+    stack: list[str] = []
+    cut = -1
+    closers = ""
+    for m in _JSON_PREFIX_TOKEN_RE.finditer(text):
+        tok = m.group()
+        if tok == '"':
+            break
+        c = tok[0]
+        if c == '"':
+            continue
+        if c == ",":
+            cut = m.start()
+        elif c == "{" or c == "[":
+            stack.append("}" if c == "{" else "]")
+            cut = m.end()
+        else:
+            if not stack:
+                break
+            stack.pop()
+            cut = m.end()
+        closers = "".join(reversed(stack))
+        if not stack:
+            break
+    if cut < 0:
+        raise ValueError("no complete JSON prefix")
+    return json_loads(text[:cut] + closers)
+
+
+def _snippet_from(result: CurlResult, limit: int = 500) -> str:
+    # Failure snippets are built once per probe response, which is not reused afterwards.
+    if result.body_json is not None:
+        return json_dumps(redact_json_inplace(result.body_json))[:limit]
+    return redact_text((result.body_text or "")[: min(limit, 200)])
+
+
+@functools.lru_cache(maxsize=1)
+def _http_session() -> Any:
+    # One keep-alive pool for the whole run (requests ships with schemathesis).
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def curl_json(
     *,
     base_url: str,
@@ -131,53 +238,57 @@ def curl_json(
     bearer: str | None = None,
     json_body: dict[str, Any] | None = None,
     timeout_s: int = 30,
+    max_body_bytes: int | None = None,
 ) -> CurlResult:
+    # max_body_bytes: read at most this much of the body (for responses only used for status/shape/snippet);
+    # a longer JSON body is parsed up to its last complete member.
+    import requests
+
     url = f"{base_url}{path}"
-    tmp_file = tempfile.NamedTemporaryFile(prefix="gw_contract_", suffix=".json", delete=False)
-    tmp_path = tmp_file.name
-    tmp_file.close()
+    headers = {"Accept": "application/json"}
+    if bearer:
+        headers["Authorization"] = f"Bearer {bearer}"
+    truncated = False
     try:
-        cmd: list[str] = [
-            "curl",
-            "-sS",
-            "-o",
-            tmp_path,
-            "-w",
-            "%{http_code}",
-            "-X",
-            method,
-            url,
-            "-H",
-            "Accept: application/json",
-        ]
-        if bearer:
-            cmd += ["-H", f"Authorization: Bearer {bearer}"]
-        if json_body is not None:
-            cmd += ["-H", "Content-Type: application/json", "--data", json.dumps(json_body)]
-
-        proc = run_cmd(cmd, timeout_s=timeout_s)
-        body_text = Path(tmp_path).read_text(encoding="utf-8", errors="replace")
-        if proc.returncode != 0:
-            stderr = redact_text(proc.stderr.strip())
-            raise RuntimeError(f"curl failed ({method} {path}): {stderr}")
-        status_code = int(proc.stdout.strip() or "0")
-        body_json: Any | None = None
-        try:
-            if body_text.strip():
-                body_json = json.loads(body_text)
-        except Exception:
-            body_json = None
-        return CurlResult(status_code=status_code, body_text=body_text, body_json=body_json)
-    finally:
-        try:
-            Path(tmp_path).unlink(missing_ok=True)
-        except Exception:
-            pass
+        resp = _http_session().request(
+            method, url, headers=headers, json=json_body, timeout=timeout_s, stream=max_body_bytes is not None
+        )
+        if max_body_bytes is None:
+            content = resp.content
+        else:
+            chunks: list[bytes] = []
+            size = 0
+            try:
+                for chunk in resp.iter_content(chunk_size=16 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > max_body_bytes:
+                        truncated = True
+                        break
+            finally:
+                resp.close()
+            content = b"".join(chunks)[:max_body_bytes]
+    except requests.RequestException as exc:
+        raise RuntimeError(f"request failed ({method} {path}): {redact_text(str(exc))}") from None
+    # Decode as UTF-8 directly; resp.text would fall back to charset detection for bare application/json.
+    body_text = content.decode("utf-8", errors="replace")
+    body_json: Any | None = None
+    try:
+        if body_text.strip():
+            body_json = parse_json_prefix(body_text) if truncated else json_loads(body_text)
+    except Exception:
+        body_json = None
+    return CurlResult(status_code=resp.status_code, body_text=body_text, body_json=body_json)
+
 
+_GIT_SHA_CMD = ["git", "rev-parse", "--short", "HEAD"]
 
+
+@functools.lru_cache(maxsize=1)
 def git_sha_short() -> str:
+    # HEAD does not move during a run; fork git once.
     try:
-        proc = run_cmd(["git", "rev-parse", "--short", "HEAD"], timeout_s=5)
+        proc = run_cmd(_GIT_SHA_CMD, timeout_s=5)
         if proc.returncode == 0:
             return proc.stdout.strip()
     except Exception:
@@ -185,13 +296,35 @@ def git_sha_short() -> str:
     return "(unknown)"
 
 
-ISO8601_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$")
+# Response bodies at least this large are scanned for date-time fields without a full JSON parse.
+_DATETIME_SCAN_MIN_BYTES = 256 * 1024
+
+
+def _iter_datetime_pairs(pattern: re.Pattern[bytes], body: bytes) -> Iterator[tuple[str, Any]]:
+    # Yields ("key", "string value") in document order for `"key": "..."` members matched by pattern.
+    for m in pattern.finditer(body):
+        raw = m.group(2)
+        try:
+            value = json_loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode("utf-8")
+        except Exception:
+            continue
+        yield m.group(1).decode("utf-8"), value
 
 
 def is_iso8601_rfc3339(value: str) -> bool:
-    if not value or "T" not in value:
+    # Positional shape check for YYYY-MM-DDTHH:MM:SS[.fff](Z|+hh:mm); fromisoformat then validates the digits.
+    n = len(value) if value else 0
+    if n < 20 or value[4] != "-" or value[7] != "-" or value[10] != "T" or value[13] != ":" or value[16] != ":":
+        return False
+    if value[-1] == "Z":
+        frac = value[19:-1]
+    elif value[-6] in "+-" and value[-3] == ":" and n >= 25:
+        frac = value[19:-6]
+    else:
+        return False
+    if frac and not (frac[0] == "." and len(frac) > 1 and frac[1:].isascii() and frac[1:].isdigit()):
         return False
-    if not ISO8601_RE.match(value):
+    if not value.isascii():
         return False
     try:
         candidate = value.replace("Z", "+00:00")
@@ -203,33 +336,58 @@ def is_iso8601_rfc3339(value: str) -> bool:
 
 def collect_datetime_property_names(schema: Any) -> set[str]:
     found: set[str] = set()
-
-    def walk(node: Any, *, prop_name: str | None = None) -> None:
+    # Explicit stack of (node, enclosing property name) instead of recursion.
+    stack: list[tuple[Any, str | None]] = [(schema, None)]
+    while stack:
+        node, prop_name = stack.pop()
         if isinstance(node, dict):
-            if node.get("format") == "date-time" and prop_name:
+            if prop_name and node.get("format") == "date-time":
                 found.add(prop_name)
             for k, v in node.items():
                 if k == "properties" and isinstance(v, dict):
                     for pname, pnode in v.items():
-                        walk(pnode, prop_name=pname)
-                else:
-                    walk(v, prop_name=prop_name)
+                        if isinstance(pnode, (dict, list)):
+                            stack.append((pnode, pname))
+                elif isinstance(v, (dict, list)):
+                    stack.append((v, prop_name))
         elif isinstance(node, list):
             for item in node:
-                walk(item, prop_name=prop_name)
-
-    walk(schema)
+                if isinstance(item, (dict, list)):
+                    stack.append((item, prop_name))
     return found
 
 
-def iter_json_key_values(obj: Any) -> Iterable[tuple[str, Any]]:
+_ITER_END = object()
+
+
+def iter_json_key_values(obj: Any, only: set[str] | None = None) -> Iterable[tuple[str, Any]]:
+    # Pre-order (same order as the recursive version) using a stack of child iterators.
+    # With `only`, just the string members whose key is in it are yielded.
+    stack: list[tuple[bool, Iterator[Any]]] = []
     if isinstance(obj, dict):
-        for k, v in obj.items():
-            yield (str(k), v)
-            yield from iter_json_key_values(v)
+        stack.append((True, iter(obj.items())))
     elif isinstance(obj, list):
-        for item in obj:
-            yield from iter_json_key_values(item)
+        stack.append((False, iter(obj)))
+    while stack:
+        is_dict, it = stack[-1]
+        item = next(it, _ITER_END)
+        if item is _ITER_END:
+            stack.pop()
+            continue
+        if is_dict:
+            k, v = item
+            if only is None:
+                yield (str(k), v)
+            elif isinstance(v, str):
+                if k in only:
+                    yield (k, v)
+                continue
+        else:
+            v = item
+        if isinstance(v, dict):
+            stack.append((True, iter(v.items())))
+        elif isinstance(v, list):
+            stack.append((False, iter(v)))
 
 
 def ensure_error_shape(body_json: Any) -> bool:
@@ -240,35 +398,48 @@ def should_ignore_404_on_cleanup(path: str) -> bool:
     return path.startswith("/admin/") or path.startswith("/providers")
 
 
-def expected_statuses_from_spec(spec: Any, *, path: str, method: str) -> str:
+def expected_statuses_table(spec: Any) -> dict[tuple[str, str], str]:
+    # (path, lowercase method) -> "|"-joined documented response codes, built once per run.
+    table: dict[tuple[str, str], str] = {}
     if not isinstance(spec, dict):
-        return "(unknown)"
+        return table
     paths = spec.get("paths")
     if not isinstance(paths, dict):
-        return "(unknown)"
-    op = paths.get(path)
-    if not isinstance(op, dict):
-        return "(unknown)"
-    m = op.get(method.lower())
-    if not isinstance(m, dict):
-        return "(unknown)"
-    responses = m.get("responses")
-    if not isinstance(responses, dict):
-        return "(unknown)"
-    keys = [str(k) for k in responses.keys()]
-    keys.sort()
-    return "|".join(keys) if keys else "(none)"
-
-
-def response_snippet(body: str | None, *, limit: int = 500) -> str | None:
+        return table
+    for path, op in paths.items():
+        if not isinstance(op, dict):
+            continue
+        for method, m in op.items():
+            if not isinstance(m, dict):
+                continue
+            responses = m.get("responses")
+            if not isinstance(responses, dict):
+                continue
+            keys = sorted(str(k) for k in responses.keys())
+            table[(path, method)] = "|".join(keys) if keys else "(none)"
+    return table
+
+
+# Failing fuzz responses and error-shape probes keep only this many body bytes; a cut-off JSON body is
+# parsed up to its last complete member (parse_json_prefix) so the snippet still goes through redact_json.
+_SNIPPET_MAX_BODY_BYTES = 64 * 1024
+
+
+def response_snippet(
+    body: str | None, *, body_json: Any | None = None, limit: int = 500, truncated: bool = False
+) -> str | None:
+    # body_json: the caller's already-parsed body (e.g. CurlResult.body_json); it is redacted in place.
+    # truncated: `body` was cut at a size cap, so a JSON body is parsed as a prefix.
+    if body_json is not None:
+        return json_dumps(redact_json_inplace(body_json))[:limit]
     if not body:
         return None
     text = body.strip()
     if not text:
         return None
     try:
-        parsed = json.loads(text)
-        return json.dumps(redact_json(parsed), ensure_ascii=False)[:limit]
+        parsed = parse_json_prefix(text) if truncated else json_loads(text)
+        return json_dumps(redact_json_inplace(parsed))[:limit]
     except Exception:
         return redact_text(text[: min(limit, 200)])
 
@@ -298,13 +469,43 @@ def requests_response_from_curl(
     return resp
 
 
+@functools.lru_cache(maxsize=4)
+def _load_openapi_schema_cached(path: str, mtime_ns: int, base_url: str) -> Any:
+    import schemathesis
+
+    return schemathesis.from_path(path, base_url=base_url)
+
+
+def load_openapi_schema(base_url: str) -> Any:
+    # Parsed once per (spec mtime, base_url); a changed openapi.yaml is picked up on the next call.
+    return _load_openapi_schema_cached(str(OPENAPI_PATH), OPENAPI_PATH.stat().st_mtime_ns, base_url)
+
+
+# id(schema) -> (schema, {(method, path): operation}); the schema is held so its id cannot be reused.
+_OPERATION_INDEX: dict[int, tuple[Any, dict[tuple[str, str], Any]]] = {}
+
+
+def _operation_index(schema: Any) -> dict[tuple[str, str], Any]:
+    entry = _OPERATION_INDEX.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        index: dict[tuple[str, str], Any] = {}
+        for res in schema.get_all_operations():
+            try:
+                op = res.ok()
+            except Exception:
+                continue
+            index.setdefault((op.method, op.path), op)
+        entry = (schema, index)
+        _OPERATION_INDEX[id(schema)] = entry
+    return entry[1]
+
+
 def get_operation(schema: Any, *, method: str, path: str) -> Any:
-    want_m = method.lower()
-    for res in schema.get_all_operations():
-        op = res.ok()
-        if op.method == want_m and op.path == path:
-            return op
-    raise KeyError(f"operation not found in schema: {method} {path}")
+    # Operations are resolved once per schema; later lookups are a dict hit.
+    op = _operation_index(schema).get((method.lower(), path))
+    if op is None:
+        raise KeyError(f"operation not found in schema: {method} {path}")
+    return op
 
 
 def validate_openapi_response(
@@ -375,6 +576,8 @@ def main() -> int:
 
     seed = int(os.getenv("CONTRACT_SEED", os.getenv("HYPOTHESIS_SEED", "20260112")))
     max_examples = int(os.getenv("CONTRACT_MAX_EXAMPLES", "20"))
+    # The gateway runs in its own process, so client-side workers only overlap network waits.
+    workers = int(os.getenv("CONTRACT_WORKERS", "0") or "0") or min(8, os.cpu_count() or 2)
 
     cfg = load_config()
     base_url = (cfg.get("GATEWAY_BASE_URL") or "").rstrip("/")
@@ -398,14 +601,30 @@ def main() -> int:
     def log(line: str) -> None:
         log_lines.append(redact_text(line))
 
-    log("== Gateway Zero OpenAPI contract (schemathesis) ==")
-    log(f"time_utc: {run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}")
+    def log_safe(line: str) -> None:
+        # Fixed literals / locally formatted numbers only; anything carrying HTTP or env content goes through log().
+        log_lines.append(line)
+
+    log_safe("== Gateway Zero OpenAPI contract (schemathesis) ==")
+    log_safe(f"time_utc: {run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}")
     log(f"git_sha : {git_sha_short()}")
     log(f"base_url: {base_url}")
     log(f"email   : {mask_secret(email)}")
-    log(f"seed    : {seed}")
-    log(f"max_ex  : {max_examples}")
-    log(f"profile : {profile}")
+    log_safe(f"seed    : {seed}")
+    log_safe(f"max_ex  : {max_examples}")
+    log_safe(f"workers : {workers}")
+    log_safe(f"profile : {profile}")
+
+    # Independent probes run on a small pool and are consumed (and logged) in the original order below.
+    probe_pool = ThreadPoolExecutor(max_workers=4)
+    me_unauth_fut = probe_pool.submit(
+        curl_json,
+        base_url=base_url,
+        method="GET",
+        path="/auth/me",
+        timeout_s=30,
+        max_body_bytes=_SNIPPET_MAX_BODY_BYTES,
+    )
 
     access_token: str | None = None
 
@@ -418,11 +637,12 @@ def main() -> int:
             json_body={"email": email, "password": password},
             timeout_s=30,
         )
-        if res.status_code == 200 and isinstance(res.body_json, dict) and isinstance(res.body_json.get("accessToken"), str):
-            access_token = res.body_json["accessToken"]
-            log("auth: POST /auth/login -> 200 (accessToken acquired)")
+        login_token = res.body_json.get("accessToken") if isinstance(res.body_json, dict) else None
+        if res.status_code == 200 and isinstance(login_token, str):
+            access_token = login_token
+            log_safe("auth: POST /auth/login -> 200 (accessToken acquired)")
         elif res.status_code == 401:
-            log("auth: POST /auth/login -> 401 (will consider bootstrap fallback)")
+            log_safe("auth: POST /auth/login -> 401 (will consider bootstrap fallback)")
             if not bootstrap_code:
                 failures.append(
                     Failure(
@@ -431,9 +651,7 @@ def main() -> int:
                         reason="login 401 and missing GATEWAY_BOOTSTRAP_CODE for bootstrap fallback",
                         status_code=401,
                         expected="200",
-                        response_snippet=json.dumps(redact_json(res.body_json), ensure_ascii=False)[:500]
-                        if res.body_json is not None
-                        else redact_text(res.body_text[:200]),
+                        response_snippet=_snippet_from(res),
                     )
                 )
             else:
@@ -446,7 +664,7 @@ def main() -> int:
                 )
                 if reg.status_code == 201:
                     bootstrap_fallback_used = True
-                    log("auth: POST /auth/register -> 201 (bootstrap fallback used)")
+                    log_safe("auth: POST /auth/register -> 201 (bootstrap fallback used)")
                 else:
                     log(f"auth: POST /auth/register -> {reg.status_code} (no bootstrap created)")
 
@@ -457,9 +675,10 @@ def main() -> int:
                     json_body={"email": email, "password": password},
                     timeout_s=30,
                 )
-                if res2.status_code == 200 and isinstance(res2.body_json, dict) and isinstance(res2.body_json.get("accessToken"), str):
-                    access_token = res2.body_json["accessToken"]
-                    log("auth: POST /auth/login (retry) -> 200 (accessToken acquired)")
+                login_token = res2.body_json.get("accessToken") if isinstance(res2.body_json, dict) else None
+                if res2.status_code == 200 and isinstance(login_token, str):
+                    access_token = login_token
+                    log_safe("auth: POST /auth/login (retry) -> 200 (accessToken acquired)")
                 else:
                     failures.append(
                         Failure(
@@ -468,9 +687,7 @@ def main() -> int:
                             reason="login failed after bootstrap attempt",
                             status_code=res2.status_code,
                             expected="200",
-                            response_snippet=json.dumps(redact_json(res2.body_json), ensure_ascii=False)[:500]
-                            if res2.body_json is not None
-                            else redact_text(res2.body_text[:200]),
+                            response_snippet=_snippet_from(res2),
                         )
                     )
         else:
@@ -481,9 +698,7 @@ def main() -> int:
                     reason="unexpected login response",
                     status_code=res.status_code,
                     expected="200",
-                    response_snippet=json.dumps(redact_json(res.body_json), ensure_ascii=False)[:500]
-                    if res.body_json is not None
-                    else redact_text(res.body_text[:200]),
+                    response_snippet=_snippet_from(res),
                 )
             )
     except Exception as e:
@@ -494,7 +709,7 @@ def main() -> int:
 
     # 401 sample: /auth/me without auth
     try:
-        me_unauth = curl_json(base_url=base_url, method="GET", path="/auth/me", timeout_s=30)
+        me_unauth = me_unauth_fut.result()
         ok = me_unauth.status_code == 401 and ensure_error_shape(me_unauth.body_json)
         error_shape_samples[401] = ok
         log(f"sample: GET /auth/me (no auth) -> {me_unauth.status_code} (error shape ok={ok})")
@@ -506,9 +721,7 @@ def main() -> int:
                     reason="401 error body missing {code,message}",
                     status_code=me_unauth.status_code,
                     expected="401",
-                    response_snippet=json.dumps(redact_json(me_unauth.body_json), ensure_ascii=False)[:500]
-                    if me_unauth.body_json is not None
-                    else redact_text(me_unauth.body_text[:200]),
+                    response_snippet=_snippet_from(me_unauth),
                 )
             )
     except Exception as e:
@@ -516,6 +729,7 @@ def main() -> int:
 
     # If we don't have an access token, we can't proceed to admin/providers schema runs.
     if not access_token:
+        probe_pool.shutdown(wait=False)
         report = "\n".join(
             [
                 f"# OpenAPI Contract Test Report ({run_id})",
@@ -542,16 +756,40 @@ def main() -> int:
         log_path.write_text("\n".join(log_lines) + "\n", encoding="utf-8")
         return 1
 
+    # The 404 probe and the 403 sample's user creation only need the admin token; issue them together.
+    missing_id = f"{run_id}_not_found"
+    cashier_email = f"{run_id}_cashier@example.com"
+    cashier_username = f"{run_id}_cashier"
+    cashier_password = secrets.token_urlsafe(18)
+    r404_fut = probe_pool.submit(
+        curl_json,
+        base_url=base_url,
+        method="GET",
+        path=f"/admin/users/{missing_id}",
+        bearer=access_token,
+        timeout_s=30,
+        max_body_bytes=_SNIPPET_MAX_BODY_BYTES,
+    )
+    created_fut = probe_pool.submit(
+        curl_json,
+        base_url=base_url,
+        method="POST",
+        path="/admin/users",
+        bearer=access_token,
+        json_body={
+            "username": cashier_username,
+            "email": cashier_email,
+            "password": cashier_password,
+            "role": "cashier",
+            "status": "active",
+        },
+        timeout_s=30,
+    )
+    probe_pool.shutdown(wait=False)
+
     # 404 sample: /admin/users/{id} not found
     try:
-        missing_id = f"{run_id}_not_found"
-        r404 = curl_json(
-            base_url=base_url,
-            method="GET",
-            path=f"/admin/users/{missing_id}",
-            bearer=access_token,
-            timeout_s=30,
-        )
+        r404 = r404_fut.result()
         ok = r404.status_code == 404 and ensure_error_shape(r404.body_json)
         error_shape_samples[404] = ok
         log(f"sample: GET /admin/users/{{id}} (missing) -> {r404.status_code} (error shape ok={ok})")
@@ -563,9 +801,7 @@ def main() -> int:
                     reason="404 error body missing {code,message}",
                     status_code=r404.status_code,
                     expected="404",
-                    response_snippet=json.dumps(redact_json(r404.body_json), ensure_ascii=False)[:500]
-                    if r404.body_json is not None
-                    else redact_text(r404.body_text[:200]),
+                    response_snippet=_snippet_from(r404),
                 )
             )
     except Exception as e:
@@ -573,29 +809,11 @@ def main() -> int:
 
     # 403 sample: create cashier user (limited write) -> login -> access admin list -> expect 403 -> cleanup
     try:
-        prefix = run_id
-        cashier_email = f"{prefix}_cashier@example.com"
-        cashier_username = f"{prefix}_cashier"
-        cashier_password = secrets.token_urlsafe(18)
-
         created_user_id: str | None = None
-        created = curl_json(
-            base_url=base_url,
-            method="POST",
-            path="/admin/users",
-            bearer=access_token,
-            json_body={
-                "username": cashier_username,
-                "email": cashier_email,
-                "password": cashier_password,
-                "role": "cashier",
-                "status": "active",
-            },
-            timeout_s=30,
-        )
+        created = created_fut.result()
         if created.status_code == 201 and isinstance(created.body_json, dict) and isinstance(created.body_json.get("id"), str):
             created_user_id = created.body_json["id"]
-            log("sample: POST /admin/users -> 201 (rbac sample user created)")
+            log_safe("sample: POST /admin/users -> 201 (rbac sample user created)")
         else:
             log(f"sample: POST /admin/users -> {created.status_code} (rbac sample user not created)")
 
@@ -608,15 +826,19 @@ def main() -> int:
                 json_body={"email": cashier_email, "password": cashier_password},
                 timeout_s=30,
             )
-            if (
-                login_cashier.status_code == 200
-                and isinstance(login_cashier.body_json, dict)
-                and isinstance(login_cashier.body_json.get("accessToken"), str)
-            ):
-                cashier_token = login_cashier.body_json["accessToken"]
+            login_token = login_cashier.body_json.get("accessToken") if isinstance(login_cashier.body_json, dict) else None
+            if login_cashier.status_code == 200 and isinstance(login_token, str):
+                cashier_token = login_token
 
         if cashier_token:
-            r = curl_json(base_url=base_url, method="GET", path="/admin/users", bearer=cashier_token, timeout_s=30)
+            r = curl_json(
+                base_url=base_url,
+                method="GET",
+                path="/admin/users",
+                bearer=cashier_token,
+                timeout_s=30,
+                max_body_bytes=_SNIPPET_MAX_BODY_BYTES,
+            )
             ok = r.status_code == 403 and ensure_error_shape(r.body_json)
             error_shape_samples[403] = ok
             log(f"sample: GET /admin/users (cashier) -> {r.status_code} (error shape ok={ok})")
@@ -628,9 +850,7 @@ def main() -> int:
                         reason="403 error body missing {code,message} (cashier token)",
                         status_code=r.status_code,
                         expected="403",
-                        response_snippet=json.dumps(redact_json(r.body_json), ensure_ascii=False)[:500]
-                        if r.body_json is not None
-                        else redact_text(r.body_text[:200]),
+                        response_snippet=_snippet_from(r),
                     )
                 )
         else:
@@ -690,8 +910,7 @@ def main() -> int:
         log(f"fixtures: prefix={mask_secret(prefix)} provider={mask_secret(provider_name)} user_email={mask_secret(user_email)}")
 
         try:
-            import schemathesis
-            schema_for_validation = schemathesis.from_path(str(OPENAPI_PATH), base_url=base_url)
+            schema_for_validation = load_openapi_schema(base_url)
 
             # Provider fixture
             r = curl_json(
@@ -797,12 +1016,17 @@ def main() -> int:
             failures.append(Failure(method="FIXTURE", path="*", reason=f"fixture setup failed: {e}"))
             write_step(False)
 
-        # Minimal write chain + read-back confirmations (best-effort)
+        # Minimal write chain + read-back confirmations (best-effort).
+        # The user, token and provider chains touch disjoint fixtures, so they run side by side;
+        # each keeps its own write -> read-back order. Steps are tallied on the main thread.
         try:
-            import schemathesis
-            schema_for_validation = schemathesis.from_path(str(OPENAPI_PATH), base_url=base_url)
+            schema_for_validation = load_openapi_schema(base_url)
+        except Exception as e:
+            failures.append(Failure(method="WRITE", path="*", reason=f"write chain validation failed: {e}"))
+            write_step(False)
+        else:
 
-            if "user_id" in fixtures:
+            def user_chain(steps: list[bool]) -> None:
                 new_username = f"{prefix}_u_upd"
                 r_put = curl_json(
                     base_url=base_url,
@@ -822,7 +1046,7 @@ def main() -> int:
                     status_code=r_put.status_code,
                     body_text=r_put.body_text,
                 )
-                write_step(True)
+                steps.append(True)
                 r_get = curl_json(
                     base_url=base_url,
                     method="GET",
@@ -840,9 +1064,9 @@ def main() -> int:
                     status_code=r_get.status_code,
                     body_text=r_get.body_text,
                 )
-                write_step(True)
+                steps.append(True)
 
-            if "token_id" in fixtures:
+            def token_chain(steps: list[bool]) -> None:
                 new_token_name = f"{prefix}_t_upd"
                 r_put = curl_json(
                     base_url=base_url,
@@ -862,7 +1086,7 @@ def main() -> int:
                     status_code=r_put.status_code,
                     body_text=r_put.body_text,
                 )
-                write_step(True)
+                steps.append(True)
                 r_toggle = curl_json(
                     base_url=base_url,
                     method="POST",
@@ -881,7 +1105,7 @@ def main() -> int:
                     status_code=r_toggle.status_code,
                     body_text=r_toggle.body_text,
                 )
-                write_step(True)
+                steps.append(True)
                 r_get = curl_json(
                     base_url=base_url,
                     method="GET",
@@ -899,87 +1123,101 @@ def main() -> int:
                     status_code=r_get.status_code,
                     body_text=r_get.body_text,
                 )
-                write_step(True)
+                steps.append(True)
 
-            # Providers chain
-            r_put = curl_json(
-                base_url=base_url,
-                method="PUT",
-                path=f"/providers/{provider_name}",
-                bearer=access_token,
-                json_body={"api_type": "openai", "base_url": "https://example.org", "models_endpoint": "https://example.org/models"},
-                timeout_s=30,
-            )
-            validate_openapi_response(
-                schema=schema_for_validation,
-                base_url=base_url,
-                method="PUT",
-                path_template="/providers/{provider}",
-                path_parameters={"provider": provider_name},
-                request_body={"api_type": "openai", "base_url": "https://example.org", "models_endpoint": "https://example.org/models"},
-                status_code=r_put.status_code,
-                body_text=r_put.body_text,
-            )
-            write_step(True)
-            r_get = curl_json(
-                base_url=base_url,
-                method="GET",
-                path=f"/providers/{provider_name}",
-                bearer=access_token,
-                timeout_s=30,
-            )
-            validate_openapi_response(
-                schema=schema_for_validation,
-                base_url=base_url,
-                method="GET",
-                path_template="/providers/{provider}",
-                path_parameters={"provider": provider_name},
-                request_body=None,
-                status_code=r_get.status_code,
-                body_text=r_get.body_text,
-            )
-            write_step(True)
+            def provider_chain(steps: list[bool]) -> None:
+                r_put = curl_json(
+                    base_url=base_url,
+                    method="PUT",
+                    path=f"/providers/{provider_name}",
+                    bearer=access_token,
+                    json_body={"api_type": "openai", "base_url": "https://example.org", "models_endpoint": "https://example.org/models"},
+                    timeout_s=30,
+                )
+                validate_openapi_response(
+                    schema=schema_for_validation,
+                    base_url=base_url,
+                    method="PUT",
+                    path_template="/providers/{provider}",
+                    path_parameters={"provider": provider_name},
+                    request_body={"api_type": "openai", "base_url": "https://example.org", "models_endpoint": "https://example.org/models"},
+                    status_code=r_put.status_code,
+                    body_text=r_put.body_text,
+                )
+                steps.append(True)
+                r_get = curl_json(
+                    base_url=base_url,
+                    method="GET",
+                    path=f"/providers/{provider_name}",
+                    bearer=access_token,
+                    timeout_s=30,
+                )
+                validate_openapi_response(
+                    schema=schema_for_validation,
+                    base_url=base_url,
+                    method="GET",
+                    path_template="/providers/{provider}",
+                    path_parameters={"provider": provider_name},
+                    request_body=None,
+                    status_code=r_get.status_code,
+                    body_text=r_get.body_text,
+                )
+                steps.append(True)
 
-            # Provider keys chain (structure only; response redaction handles `value`)
-            r_keys = curl_json(
-                base_url=base_url,
-                method="GET",
-                path=f"/providers/{provider_name}/keys",
-                bearer=access_token,
-                timeout_s=30,
-            )
-            validate_openapi_response(
-                schema=schema_for_validation,
-                base_url=base_url,
-                method="GET",
-                path_template="/providers/{provider}/keys",
-                path_parameters={"provider": provider_name},
-                request_body=None,
-                status_code=r_keys.status_code,
-                body_text=r_keys.body_text,
-            )
-            write_step(True)
-            r_raw = curl_json(
-                base_url=base_url,
-                method="GET",
-                path=f"/providers/{provider_name}/keys/raw",
-                bearer=access_token,
-                timeout_s=30,
-            )
-            validate_openapi_response(
-                schema=schema_for_validation,
-                base_url=base_url,
-                method="GET",
-                path_template="/providers/{provider}/keys/raw",
-                path_parameters={"provider": provider_name},
-                request_body=None,
-                status_code=r_raw.status_code,
-                body_text=r_raw.body_text,
-            )
-            write_step(True)
-        except Exception as e:
-            failures.append(Failure(method="WRITE", path="*", reason=f"write chain validation failed: {e}"))
-            write_step(False)
+                # Provider keys chain (structure only; response redaction handles `value`)
+                r_keys = curl_json(
+                    base_url=base_url,
+                    method="GET",
+                    path=f"/providers/{provider_name}/keys",
+                    bearer=access_token,
+                    timeout_s=30,
+                )
+                validate_openapi_response(
+                    schema=schema_for_validation,
+                    base_url=base_url,
+                    method="GET",
+                    path_template="/providers/{provider}/keys",
+                    path_parameters={"provider": provider_name},
+                    request_body=None,
+                    status_code=r_keys.status_code,
+                    body_text=r_keys.body_text,
+                )
+                steps.append(True)
+                r_raw = curl_json(
+                    base_url=base_url,
+                    method="GET",
+                    path=f"/providers/{provider_name}/keys/raw",
+                    bearer=access_token,
+                    timeout_s=30,
+                )
+                validate_openapi_response(
+                    schema=schema_for_validation,
+                    base_url=base_url,
+                    method="GET",
+                    path_template="/providers/{provider}/keys/raw",
+                    path_parameters={"provider": provider_name},
+                    request_body=None,
+                    status_code=r_raw.status_code,
+                    body_text=r_raw.body_text,
+                )
+                steps.append(True)
+
+            chains: list[Callable[[list[bool]], None]] = []
+            if "user_id" in fixtures:
+                chains.append(user_chain)
+            if "token_id" in fixtures:
+                chains.append(token_chain)
+            chains.append(provider_chain)
+            chain_steps: list[list[bool]] = [[] for _ in chains]
+            with ThreadPoolExecutor(max_workers=len(chains)) as chain_pool:
+                chain_futs = [chain_pool.submit(fn, steps) for fn, steps in zip(chains, chain_steps)]
+            for fut, steps in zip(chain_futs, chain_steps):
+                for ok in steps:
+                    write_step(ok)
+                exc = fut.exception()
+                if exc is not None:
+                    failures.append(Failure(method="WRITE", path="*", reason=f"write chain validation failed: {exc}"))
+                    write_step(False)
 
     # --- Schema-based contract fuzz (profile-dependent; fixture injected) ---
     schema_total = 0
@@ -989,6 +1227,8 @@ def main() -> int:
     schemathesis_version = "(unknown)"
     datetime_checked = 0
     datetime_invalid = 0
+    # Checks run on the runner's worker threads.
+    datetime_lock = threading.Lock()
     included_ops: list[str] = []
 
     try:
@@ -1001,40 +1241,45 @@ def main() -> int:
 
         schemathesis_version = getattr(schemathesis, "__version__", "(unknown)")
 
-        schema = schemathesis.from_path(str(OPENAPI_PATH), base_url=base_url)
+        # Same parsed schema as the write-chain validation and cleanup steps.
+        schema = load_openapi_schema(base_url)
         spec = schema.raw_schema if hasattr(schema, "raw_schema") else None
+        expected_by_op = expected_statuses_table(spec)
         datetime_keys = collect_datetime_property_names(spec) if isinstance(spec, dict) else set()
+        # Large bodies are sampled straight from the raw bytes instead of building the whole JSON tree.
+        datetime_value_re = (
+            re.compile(
+                rb'"(' + b"|".join(re.escape(k.encode("utf-8")) for k in sorted(datetime_keys)) + rb')"\s*:\s*"((?:[^"\\]|\\.)*)"'
+            )
+            if datetime_keys
+            else None
+        )
+
+        skip_paths = frozenset({"/auth/login", "/auth/refresh", "/auth/register"})
+        scope_prefixes = ("/admin/users", "/admin/tokens", "/providers")
+        read_methods = frozenset({"GET", "HEAD"})
+        # write profile allowlist: minimal safe writes (no create endpoints)
+        allowed_writes = frozenset(
+            {
+                ("PUT", "/admin/users/{id}"),
+                ("PUT", "/admin/tokens/{id}"),
+                ("PUT", "/providers/{provider}"),
+                ("POST", "/admin/tokens/{id}/toggle"),
+            }
+        )
 
         def operation_filter(op: Any) -> bool:
             operation = getattr(op, "operation", op)
             path = getattr(operation, "path", "")
             method = str(getattr(operation, "method", "")).upper()
-            if path.startswith("/v1/"):
-                return False
-            if path in {"/auth/login", "/auth/refresh", "/auth/register"}:
+            if path.startswith("/v1/") or path in skip_paths:
                 return False
             # include 仍限定：/auth/me、/admin/users*、/admin/tokens*、/providers*、/providers/*/keys*
-            in_scope = (
-                path == "/auth/me"
-                or path.startswith("/admin/users")
-                or path.startswith("/admin/tokens")
-                or path.startswith("/providers")
-            )
-            if not in_scope:
+            if path != "/auth/me" and not path.startswith(scope_prefixes):
                 return False
-
-            if not is_write_profile:
-                return method in {"GET", "HEAD"}
-
-            # write profile: allow GET/HEAD + minimal safe writes (no create endpoints)
-            if method in {"GET", "HEAD"}:
-                return True
-            # allowlisted writes
-            if method == "PUT" and path in {"/admin/users/{id}", "/admin/tokens/{id}", "/providers/{provider}"}:
+            if method in read_methods:
                 return True
-            if method == "POST" and path == "/admin/tokens/{id}/toggle":
-                return True
-            return False
+            return is_write_profile and (method, path) in allowed_writes
 
         # Ensure we don't accidentally accumulate global hooks across multiple runs.
         hooks.unregister_all()
@@ -1077,12 +1322,13 @@ def main() -> int:
                     case.body = {"api_type": "openai", "base_url": "https://example.org", "models_endpoint": None}
                     case.media_type = "application/json"
 
+        # Listed from the per-schema operation index (already resolved when the write chain ran) rather
+        # than resolving every operation of the filtered clone a second time.
+        included_ops.extend(
+            f"{op.method.upper()} {op.path}" for op in _operation_index(schema).values() if operation_filter(op)
+        )
         schema = schema.include(func=operation_filter)
 
-        for res in schema.get_all_operations():
-            op = res.ok()
-            included_ops.append(f"{op.method.upper()} {op.path}")
-
         def openapi_contract_check(ctx: Any, response: Any, case: Any) -> bool | None:
             try:
                 # We always attach Authorization in `before_call`; disable the "ignored auth"
@@ -1097,23 +1343,39 @@ def main() -> int:
             nonlocal datetime_checked, datetime_invalid
             if not datetime_keys:
                 return None
-            try:
-                payload = response.json()
-            except Exception:
-                return None
-            if not isinstance(payload, (dict, list)):
-                return None
+            pairs: Iterable[tuple[str, Any]]
+            body = getattr(response, "content", None)
+            if (
+                datetime_value_re is not None
+                and isinstance(body, bytes)
+                and len(body) >= _DATETIME_SCAN_MIN_BYTES
+                and "json" in (response.headers.get("Content-Type") or "")
+            ):
+                pairs = _iter_datetime_pairs(datetime_value_re, body)
+            else:
+                try:
+                    # Parse the raw bytes directly (orjson when installed) instead of requests' text decode + json.
+                    payload = json_loads(body) if isinstance(body, bytes) else response.json()
+                except Exception:
+                    return None
+                if not isinstance(payload, (dict, list)):
+                    return None
+                pairs = iter_json_key_values(payload, datetime_keys)
 
             # Keep it fast & deterministic: validate up to 30 date-time fields per run.
-            for key, value in iter_json_key_values(payload):
+            for key, value in pairs:
                 if key in datetime_keys and isinstance(value, str):
-                    datetime_checked += 1
-                    if not is_iso8601_rfc3339(value):
-                        datetime_invalid += 1
+                    valid = is_iso8601_rfc3339(value)
+                    with datetime_lock:
+                        datetime_checked += 1
+                        if not valid:
+                            datetime_invalid += 1
+                        done = datetime_checked >= 30
+                    if not valid:
                         raise CheckFailed(
                             f"date-time field '{key}' is not RFC3339/ISO-8601 (masked={mask_secret(value, keep=12)})"
                         )
-                    if datetime_checked >= 30:
+                    if done:
                         break
             return True
 
@@ -1122,7 +1384,7 @@ def main() -> int:
             checks=(openapi_contract_check, datetime_sampling_check),
             hypothesis_settings=hypo_settings(max_examples=max_examples, deadline=None),
             seed=seed,
-            workers_num=1,
+            workers_num=workers,
             request_timeout=30,
         )
 
@@ -1140,31 +1402,41 @@ def main() -> int:
 
             if result.has_failures or result.has_errors or result.is_errored:
                 schema_failed += 1
-                expected = expected_statuses_from_spec(spec, path=path, method=method)
+                expected = expected_by_op.get((path, method.lower()), "(unknown)")
                 actual_status: int | None = None
                 snippet: str | None = None
 
                 reasons: list[str] = []
                 for check in result.checks:
-                    if check.value != Status.success:
-                        title = getattr(check, "title", None) or check.name
-                        msg = (check.message or "").strip().splitlines()[0] if (check.message or "").strip() else ""
-                        reasons.append(f"{title}: {msg}".strip())
-                        if actual_status is None and check.response is not None:
-                            actual_status = check.response.status_code
-                            try:
-                                body_bytes = check.response.deserialize_body()
-                                body_text = (
-                                    body_bytes.decode(check.response.encoding or "utf-8", errors="replace")
-                                    if body_bytes is not None
-                                    else None
+                    if check.value == Status.success:
+                        continue
+                    title = getattr(check, "title", None) or check.name
+                    message = (check.message or "").strip()
+                    msg = message.splitlines()[0] if message else ""
+                    reasons.append(f"{title}: {msg}".strip())
+                    check_response = check.response
+                    if actual_status is None and check_response is not None:
+                        actual_status = check_response.status_code
+                        body_truncated = False
+                        try:
+                            # The body is serialized as base64; decode only the prefix covering the snippet cap.
+                            body_b64 = check_response.body
+                            if body_b64 is None:
+                                body_text = None
+                            else:
+                                b64_cap = -(-_SNIPPET_MAX_BODY_BYTES // 3) * 4
+                                body_bytes = base64.b64decode(body_b64[:b64_cap])
+                                body_truncated = len(body_bytes) > _SNIPPET_MAX_BODY_BYTES
+                                body_text = body_bytes[:_SNIPPET_MAX_BODY_BYTES].decode(
+                                    check_response.encoding or "utf-8", errors="replace"
                                 )
-                            except Exception:
-                                body_text = check.response.body
-                            snippet = response_snippet(body_text)
+                        except Exception:
+                            body_text = check_response.body
+                        snippet = response_snippet(body_text, truncated=body_truncated)
 
-                for err in result.errors:
-                    reasons.append(f"error: {err.type.value}{(' ' + err.message) if err.message else ''}".strip())
+                reasons.extend(
+                    f"error: {err.type.value}{(' ' + err.message) if err.message else ''}".strip() for err in result.errors
+                )
 
                 reason = redact_text(" | ".join(reasons) or "contract validation failed")[:400]
                 failures.append(
@@ -1189,8 +1461,7 @@ def main() -> int:
     # --- Cleanup (write profile) ---
     if is_write_profile and access_token:
         try:
-            import schemathesis
-            schema_for_validation = schemathesis.from_path(str(OPENAPI_PATH), base_url=base_url)
+            schema_for_validation = load_openapi_schema(base_url)
 
             # Provider key
             if fixtures.get("provider_name") and created_provider_key:
@@ -1222,7 +1493,7 @@ def main() -> int:
                             reason="cleanup provider key returned unexpected status",
                             status_code=r.status_code,
                             expected="200|404",
-                            response_snippet=response_snippet(r.body_text),
+                            response_snippet=response_snippet(r.body_text, body_json=r.body_json),
                         )
                     )
                     write_step(False)
@@ -1260,7 +1531,7 @@ def main() -> int:
                             reason="cleanup provider returned unexpected status",
                             status_code=r.status_code,
                             expected="200|404",
-                            response_snippet=response_snippet(r.body_text),
+                            response_snippet=response_snippet(r.body_text, body_json=r.body_json),
                         )
                     )
                     write_step(False)
@@ -1298,7 +1569,7 @@ def main() -> int:
                             reason="cleanup token returned unexpected status",
                             status_code=r.status_code,
                             expected="204|404",
-                            response_snippet=response_snippet(r.body_text),
+                            response_snippet=response_snippet(r.body_text, body_json=r.body_json),
                         )
                     )
                     write_step(False)
@@ -1336,7 +1607,7 @@ def main() -> int:
                             reason="cleanup user returned unexpected status",
                             status_code=r.status_code,
                             expected="204|404",
-                            response_snippet=response_snippet(r.body_text),
+                            response_snippet=response_snippet(r.body_text, body_json=r.body_json),
                         )
                     )
                     write_step(False)
@@ -1357,6 +1628,7 @@ def main() -> int:
     report_lines.append(f"- schemathesis：{schemathesis_version}")
     report_lines.append(f"- seed：{seed}")
     report_lines.append(f"- max_examples：{max_examples}")
+    report_lines.append(f"- workers：{workers}")
     report_lines.append(f"- profile：{'write+cleanup (fixture injected)' if is_write_profile else 'read (GET/HEAD only)'}")
     report_lines.append(
         "- 过滤策略：include=/auth/me + /admin/* + /providers*；methods=GET/HEAD；skip=/auth/login,/auth/refresh,/auth/register,/v1/*"
@@ -1386,19 +1658,26 @@ def main() -> int:
     report_lines.append(f"- operations_included: {len(included_ops)}")
     if included_ops:
         report_lines.append("- operations (methods+paths):")
-        for op in sorted(included_ops):
-            report_lines.append(f"  - {op}")
+        included_ops.sort()
+        report_lines.extend(f"  - {op}" for op in included_ops)
     report_lines.append("")
 
     if failures:
         report_lines.append("## Failures")
-        for f in failures:
-            line = f"- {f.method} {f.path} :: {f.reason}"
-            if f.status_code is not None or f.expected is not None:
-                line += f" :: status={f.status_code} expected={f.expected}"
-            if f.response_snippet:
-                line += f" :: snippet={f.response_snippet}"
-            report_lines.append(redact_text(line))
+        report_lines.extend(
+            redact_text(
+                "".join(
+                    (
+                        f"- {f.method} {f.path} :: {f.reason}",
+                        f" :: status={f.status_code} expected={f.expected}"
+                        if f.status_code is not None or f.expected is not None
+                        else "",
+                        f" :: snippet={f.response_snippet}" if f.response_snippet else "",
+                    )
+                )
+            )
+            for f in failures
+        )
     else:
         report_lines.append("## Failures")
         report_lines.append("- (none)")
@@ -1408,8 +1687,10 @@ def main() -> int:
     report_lines.append(f"- report: {report_path.as_posix()}")
     report_lines.append(f"- log: {log_path.as_posix()}")
 
-    report_path.write_text("\n".join(report_lines) + "\n", encoding="utf-8")
-    log_path.write_text("\n".join(log_lines) + "\n", encoding="utf-8")
+    report_lines.append("")
+    log_lines.append("")
+    report_path.write_text("\n".join(report_lines), encoding="utf-8")
+    log_path.write_text("\n".join(log_lines), encoding="utf-8")
 
     return 0 if overall_pass else 1
 
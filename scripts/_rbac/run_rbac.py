@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import functools
+import http.client
 import json
 import os
 import re
 import secrets
 import subprocess
 import sys
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
 
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
@@ -34,6 +43,7 @@ SENSITIVE_JSON_KEYS = {
 }
 
 SENSITIVE_KEY_SUBSTRINGS = ("token", "password", "secret", "key", "authorization")
+_SENSITIVE_SUBSTRING_RE = re.compile("|".join(SENSITIVE_KEY_SUBSTRINGS))
 
 
 def utc_now() -> datetime:
@@ -54,27 +64,37 @@ def mask_secret(value: str | None, keep: int = 8) -> str:
     return f"{s[:keep]}…(len={n})"
 
 
-def redact_bearer(text: str) -> str:
-    text = re.sub(r"(?i)(Authorization:\s*Bearer)\s+([^\s]+)", r"\1 ***REDACTED***", text)
-    text = re.sub(r"(?i)\\bBearer\\s+([A-Za-z0-9._+/=\\-]+)\\b", "Bearer ***REDACTED***", text)
-    return text
+_BEARER_HEADER_RE = re.compile(r"(?i)(Authorization:\s*Bearer)\s+([^\s]+)")
+# Bare-bearer and JSON-secret patterns in one pass; neither can span a `"`, so their matches never overlap.
+# The header pattern stays a separate first pass: its `\S+` token could otherwise be cut short by a bare match.
+_REDACT_RE = re.compile(
+    r"\bBearer\s+[A-Za-z0-9._+/=\-]+\b"
+    r'|"(?P<jkey>refreshToken|accessToken|password|token|key|value)"\s*:\s*"[^"]+"',
+    re.IGNORECASE,
+)
+# Cheap prefilter: the bearer branches need the (case-insensitive) literal "bearer", the JSON one a quote.
+_BEARER_PROBE_RE = re.compile("bearer", re.IGNORECASE)
+
+
+def _redact_match(m: re.Match[str]) -> str:
+    jkey = m.group("jkey")
+    if jkey is not None:
+        return f"\"{jkey}\": \"***REDACTED***\""
+    return "Bearer ***REDACTED***"
 
 
 def redact_text(text: str) -> str:
-    text = redact_bearer(text)
-    text = re.sub(
-        r'(?i)"(refreshToken|accessToken|password|token|key|value)"\s*:\s*"[^"]+"',
-        lambda m: f"\"{m.group(1)}\": \"***REDACTED***\"",
-        text,
-    )
-    return text
+    if '"' not in text and _BEARER_PROBE_RE.search(text) is None:
+        return text
+    text = _BEARER_HEADER_RE.sub(r"\1 ***REDACTED***", text)
+    return _REDACT_RE.sub(_redact_match, text)
 
 
+# The same handful of keys recurs across every response body.
+@functools.lru_cache(maxsize=2048)
 def _is_sensitive_key(key: str) -> bool:
     k = key.lower()
-    if k in SENSITIVE_JSON_KEYS:
-        return True
-    return any(sub in k for sub in SENSITIVE_KEY_SUBSTRINGS)
+    return k in SENSITIVE_JSON_KEYS or _SENSITIVE_SUBSTRING_RE.search(k) is not None
 
 
 def redact_json(value: Any) -> Any:
@@ -96,18 +116,43 @@ def redact_json(value: Any) -> Any:
     return value
 
 
+def redact_json_inplace(value: Any) -> Any:
+    # Same redaction as redact_json, but iterative and rewriting the (caller-owned) containers in place.
+    stack: list[Any] = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if _is_sensitive_key(str(k)):
+                    if isinstance(v, str):
+                        node[k] = f"***REDACTED*** (len={len(v)})"
+                    elif v is not None:
+                        node[k] = "***REDACTED***"
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+    return value
+
+
 def parse_env_file(path: Path) -> dict[str, str]:
     if not path.exists():
         return {}
     env: dict[str, str] = {}
     for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.rstrip("\r")
-        if not line.strip() or line.lstrip().startswith("#"):
+        line = raw.rstrip("\r").lstrip()
+        if not line or line[0] == "#":
             continue
-        m = re.match(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*([=:])\s*(.*)\s*$", line)
-        if not m:
+        # KEY=value / KEY: value; the first '=' or ':' is the separator (neither can appear in KEY).
+        eq = line.find("=")
+        colon = line.find(":")
+        sep = colon if eq < 0 or (0 <= colon < eq) else eq
+        if sep < 0:
             continue
-        key, _sep, val = m.group(1), m.group(2), m.group(3)
+        key = line[:sep].rstrip()
+        if not (key.isascii() and key.isidentifier()):
+            continue
+        val = line[sep + 1 :].lstrip()
         if val.startswith('"') and val.endswith('"') and len(val) >= 2:
             val = val[1:-1]
         env[key] = val
@@ -120,23 +165,99 @@ def load_config() -> dict[str, str]:
     return parse_env_file(env_path) or parse_env_file(example_path)
 
 
+def json_dumps(value: Any) -> str:
+    # Non-ASCII stays readable in snippets (orjson always emits UTF-8).
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False)
+
+
+def json_loads(text: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
 @dataclass(frozen=True)
 class CurlResult:
     status_code: int
-    body_text: str
+    body_bytes: bytes
     body_json: Any | None
 
+    @functools.cached_property
+    def body_text(self) -> str:
+        # Decoded only for the snippet/error paths; JSON is parsed straight from the bytes.
+        return self.body_bytes.decode("utf-8", errors="replace")
+
 
 def run_cmd(cmd: list[str], *, timeout_s: int = 30) -> subprocess.CompletedProcess[str]:
     return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_s)
 
 
+# Keep-alive connections, one per (thread, scheme, host): the readiness probe, logins and the
+# case matrix reuse the same socket instead of forking a `curl` per request.
+_http_local = threading.local()
+
+_STALE_CONN_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+# Only these may go out on an idle keep-alive socket and be resent if it turns out stale. Anything else (the
+# /auth/* and /admin/users POSTs) gets a fresh connection: a failed send could already have been applied.
+_RETRY_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _http_conn(scheme: str, netloc: str) -> http.client.HTTPConnection:
+    pool: dict[tuple[str, str], http.client.HTTPConnection] | None = getattr(_http_local, "pool", None)
+    if pool is None:
+        pool = _http_local.pool = {}
+    conn = pool.get((scheme, netloc))
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = pool[(scheme, netloc)] = cls(netloc)
+    return conn
+
+
+def _http_request(
+    method: str,
+    url: str,
+    *,
+    headers: dict[str, str],
+    body: bytes | None = None,
+    timeout_s: float = 30,
+) -> tuple[int, bytes]:
+    parts = urlsplit(url)
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    while True:
+        conn = _http_conn(parts.scheme, parts.netloc)
+        if conn.sock is not None and method not in _RETRY_SAFE_METHODS:
+            conn.close()
+        reused = conn.sock is not None
+        conn.timeout = timeout_s
+        if reused:
+            conn.sock.settimeout(timeout_s)
+        try:
+            conn.request(method, target, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except _STALE_CONN_ERRORS:
+            conn.close()
+            # The server may drop idle keep-alive sockets (e.g. after a restart); retry once fresh.
+            if reused:
+                continue
+            raise
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        return resp.status, data
+
+
 def curl_http_code(url: str, *, timeout_s: int = 8) -> tuple[int, str]:
-    cmd = ["curl", "-sS", "-o", "/dev/null", "-w", "%{http_code}", url]
-    proc = run_cmd(cmd, timeout_s=timeout_s)
-    if proc.returncode != 0:
-        return proc.returncode, ""
-    return 0, (proc.stdout or "").strip()
+    # (0, status) or (non-zero, "") on transport errors, as with `curl -w %{http_code}`.
+    try:
+        status, _ = _http_request("GET", url, headers={}, timeout_s=timeout_s)
+    except (OSError, http.client.HTTPException):
+        return 1, ""
+    return 0, str(status)
 
 
 def curl_json(
@@ -148,56 +269,38 @@ def curl_json(
     json_body: dict[str, Any] | None = None,
     timeout_s: int = 30,
 ) -> CurlResult:
-    url = f"{base_url}{path}"
-    tmp_file = tempfile.NamedTemporaryFile(prefix="gw_rbac_", suffix=".json", delete=False)
-    tmp_path = tmp_file.name
-    tmp_file.close()
+    headers = {"Accept": "application/json"}
+    if bearer:
+        headers["Authorization"] = f"Bearer {bearer}"
+    data: bytes | None = None
+    if json_body is not None:
+        headers["Content-Type"] = "application/json"
+        data = json_dumps(json_body).encode("utf-8")
     try:
-        cmd: list[str] = [
-            "curl",
-            "-sS",
-            "-o",
-            tmp_path,
-            "-w",
-            "%{http_code}",
-            "-X",
-            method,
-            url,
-            "-H",
-            "Accept: application/json",
-        ]
-        if bearer:
-            cmd += ["-H", f"Authorization: Bearer {bearer}"]
-        if json_body is not None:
-            cmd += ["-H", "Content-Type: application/json", "--data", json.dumps(json_body)]
-
-        proc = run_cmd(cmd, timeout_s=timeout_s)
-        body_text = Path(tmp_path).read_text(encoding="utf-8", errors="replace")
-        if proc.returncode != 0:
-            stderr = redact_text(proc.stderr.strip())
-            raise RuntimeError(f"curl failed ({method} {path}): {stderr}")
-        status_code = int((proc.stdout or "").strip() or "0")
-        body_json: Any | None = None
-        try:
-            if body_text.strip():
-                body_json = json.loads(body_text)
-        except Exception:
-            body_json = None
-        return CurlResult(status_code=status_code, body_text=body_text, body_json=body_json)
-    finally:
-        try:
-            Path(tmp_path).unlink(missing_ok=True)
-        except Exception:
-            pass
+        status_code, raw = _http_request(method, f"{base_url}{path}", headers=headers, body=data, timeout_s=timeout_s)
+    except (OSError, http.client.HTTPException) as exc:
+        raise RuntimeError(f"request failed ({method} {path}): {redact_text(str(exc))}") from None
+    body_json: Any | None = None
+    try:
+        if raw.strip():
+            body_json = json_loads(raw)
+    except Exception:
+        body_json = None
+    return CurlResult(status_code=status_code, body_bytes=raw, body_json=body_json)
 
 
 def ensure_error_shape(body_json: Any) -> bool:
     return isinstance(body_json, dict) and "code" in body_json and "message" in body_json
 
 
+_GIT_SHA_CMD = ["git", "rev-parse", "--short", "HEAD"]
+
+
+@functools.lru_cache(maxsize=1)
 def git_sha_short() -> str:
+    # HEAD does not move during a run; fork git once.
     try:
-        proc = run_cmd(["git", "rev-parse", "--short", "HEAD"], timeout_s=5)
+        proc = run_cmd(_GIT_SHA_CMD, timeout_s=5)
         if proc.returncode == 0:
             return proc.stdout.strip()
     except Exception:
@@ -205,28 +308,77 @@ def git_sha_short() -> str:
     return "(unknown)"
 
 
-def response_snippet(body_text: str, *, limit: int = 300) -> str:
+def _redacted_len(value: Any) -> int:
+    # Serialized length of what redact_json puts under a sensitive key.
+    if isinstance(value, str):
+        return len(f"***REDACTED*** (len={len(value)})") + 2
+    return 4 if value is None else 16
+
+
+def _truncate_tree(value: Any, budget: int) -> tuple[Any, int]:
+    # Copy of the leading part of `value` plus a lower bound of its serialized length (compact separators).
+    # Members are kept until that bound passes `budget`, so the first `budget` chars of the redacted dump
+    # are the same as for the whole tree. Containers are fresh; sensitive subtrees are left for redaction.
+    if isinstance(value, dict):
+        out: dict[str, Any] = {}
+        used = 1
+        for k, v in value.items():
+            if used > budget:
+                break
+            used += len(k) + (3 if out else 2) + 1
+            if _is_sensitive_key(str(k)):
+                out[k] = v
+                used += _redacted_len(v)
+            else:
+                out[k], n = _truncate_tree(v, budget - used)
+                used += n
+        return out, used
+    if isinstance(value, list):
+        items: list[Any] = []
+        used = 1
+        for v in value:
+            if used > budget:
+                break
+            if items:
+                used += 1
+            item, n = _truncate_tree(v, budget - used)
+            items.append(item)
+            used += n
+        return items, used
+    if isinstance(value, str):
+        return value, len(value) + 2
+    return value, len(json_dumps(value))
+
+
+def response_snippet(body_text: str, parsed: Any | None = None, *, limit: int = 300) -> str:
+    # `parsed` is the caller's already-parsed body (CurlResult.body_json). Only the part that can reach the
+    # snippet is copied, redacted and serialized; the caller's object is left untouched.
+    if parsed is not None:
+        return json_dumps(redact_json_inplace(_truncate_tree(parsed, limit)[0]))[:limit]
     text = (body_text or "").strip()
     if not text:
         return ""
     try:
-        parsed = json.loads(text)
-        return json.dumps(redact_json(parsed), ensure_ascii=False)[:limit]
+        parsed = json_loads(text)
+        return json_dumps(redact_json_inplace(_truncate_tree(parsed, limit)[0]))[:limit]
     except Exception:
         return redact_text(text[:limit])
 
 
-JWT_LIKE_RE = re.compile(r"eyJ[A-Za-z0-9_-]{10,}\\.[A-Za-z0-9_-]{10,}\\.[A-Za-z0-9_-]{10,}")
+JWT_LIKE_RE = re.compile(r"eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}")
+# All three leak checks in one scan; the named group says which one hit first.
+_LEAK_RE = re.compile(
+    r"(?P<header>Authorization: Bearer )"
+    rf"|(?P<jwt>{JWT_LIKE_RE.pattern})"
+    r"|(?P<bearer>(?i:\bBearer)\s+(?!\*\*\*REDACTED\*\*\*)[A-Za-z0-9._+/=\-]{20,})"
+)
+_LEAK_LABELS = {"header": "Authorization header", "jwt": "JWT-like token", "bearer": "bearer token"}
 
 
 def assert_no_secret_leak(text: str, *, where: str) -> None:
-    if "Authorization: Bearer " in text:
-        raise RuntimeError(f"secret leak detected in {where}: Authorization header")
-    if JWT_LIKE_RE.search(text):
-        raise RuntimeError(f"secret leak detected in {where}: JWT-like token")
-    m = re.search(r"(?i)\\bBearer\\s+(?!\\*\\*\\*REDACTED\\*\\*\\*)([A-Za-z0-9._+/=\\-]{20,})", text)
+    m = _LEAK_RE.search(text)
     if m:
-        raise RuntimeError(f"secret leak detected in {where}: bearer token")
+        raise RuntimeError(f"secret leak detected in {where}: {_LEAK_LABELS[m.lastgroup]}")
 
 
 def append_workflow_record(*, report_path: Path, pass_count: int, fail_count: int, total: int) -> None:
@@ -244,32 +396,44 @@ def append_workflow_record(*, report_path: Path, pass_count: int, fail_count: in
     )
 
     text = doc_path.read_text(encoding="utf-8")
-    lines = text.splitlines(keepends=True)
-    insert_at = None
-    heading_idx = None
-    for i, line in enumerate(lines):
-        if line.startswith("#### ") and "接口测试记录" in line:
-            heading_idx = i
+    # Find the first "#### ...接口测试记录" line and the next section header after it with plain str.find.
+    body_start = -1
+    if text.startswith("#### "):
+        start = 0
+    else:
+        nxt = text.find("\n#### ")
+        start = nxt + 1 if nxt >= 0 else -1
+    while start >= 0:
+        eol = text.find("\n", start)
+        line_end = len(text) if eol < 0 else eol
+        if "接口测试记录" in text[start:line_end]:
+            body_start = line_end + 1
             break
-    if heading_idx is None:
+        nxt = text.find("\n#### ", line_end)
+        start = nxt + 1 if nxt >= 0 else -1
+    if body_start < 0:
         doc_path.write_text(text + "\n" + record, encoding="utf-8")
         return
 
-    for j in range(heading_idx + 1, len(lines)):
-        if lines[j].startswith(("#### ", "### ", "## ")):
-            insert_at = j
-            break
-    if insert_at is None:
-        insert_at = len(lines)
+    insert_at = len(text)
+    for marker in ("\n#### ", "\n### ", "\n## "):
+        idx = text.find(marker, body_start - 1)
+        if 0 <= idx < insert_at:
+            insert_at = idx + 1
 
     if record in text:
         return
 
-    lines.insert(insert_at, record)
-    doc_path.write_text("".join(lines), encoding="utf-8")
+    doc_path.write_text(text[:insert_at] + record + text[insert_at:], encoding="utf-8")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class CreatedUser:
+    id: str
+    email: str
+
+
+@dataclass(frozen=True, slots=True)
 class CaseResult:
     role: str
     method: str
@@ -283,6 +447,7 @@ class CaseResult:
 def main() -> int:
     run_dt = utc_now()
     run_stamp = utc_compact_timestamp(run_dt)
+    run_dt_iso = run_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
     run_rand = secrets.token_hex(3)
     run_id = f"rbac_{run_stamp}_{run_rand}"
 
@@ -299,8 +464,12 @@ def main() -> int:
 
     log_lines: list[str] = []
 
+    # Lines are kept raw and the whole log is redacted once when it is written.
     def log(line: str) -> None:
-        log_lines.append(redact_text(line))
+        log_lines.append(line)
+
+    def render_log() -> str:
+        return redact_text("\n".join(log_lines) + "\n")
 
     if not email or not password:
         msg = "FATAL: missing config from .env/.env.example. Need EMAIL, PASSWORD. (GATEWAY_BASE_URL optional)"
@@ -309,19 +478,19 @@ def main() -> int:
         return 2
 
     log("== Gateway Zero RBAC boundary business tests ==")
-    log(f"time_utc: {run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}")
+    log(f"time_utc: {run_dt_iso}")
     log(f"git_sha : {git_sha_short()}")
     log(f"base_url: {base_url}")
     log(f"email   : {mask_secret(email)}")
 
     ready_url = f"{base_url}/auth/me"
-    log(f"ready_check: curl {ready_url}")
+    log(f"ready_check: GET {ready_url}")
     rc, code = curl_http_code(ready_url, timeout_s=8)
     if rc != 0 or not code or code == "000":
         msg = "FATAL: 无法连接到后端，请先启动数据库与后端：`docker start gateway-postgres` + `cargo run`"
         report_path.write_text(msg + "\n", encoding="utf-8")
         log(msg)
-        log_path.write_text("\n".join(log_lines) + "\n", encoding="utf-8")
+        log_path.write_text(render_log(), encoding="utf-8")
         return 2
     log(f"ready_check_ok: http_code={code} (401/200 都视为 OK)")
 
@@ -348,13 +517,13 @@ def main() -> int:
                 json_body={"bootstrap_code": bootstrap_code, "email": email, "password": password},
                 timeout_s=30,
             )
-            log(f"register_status={reg.status_code} register_body={response_snippet(reg.body_text)}")
+            log(f"register_status={reg.status_code} register_body={response_snippet(reg.body_text, reg.body_json)}")
             if reg.status_code == 201:
                 bootstrap_fallback_used = True
                 res = login(login_email=email, login_password=password)
 
         if res.status_code != 200 or not isinstance(res.body_json, dict):
-            raise RuntimeError(f"superadmin login failed: status={res.status_code} body={response_snippet(res.body_text)}")
+            raise RuntimeError(f"superadmin login failed: status={res.status_code} body={response_snippet(res.body_text, res.body_json)}")
         access_token = str(res.body_json.get("accessToken") or "")
         if not access_token:
             raise RuntimeError("superadmin login response missing accessToken")
@@ -363,10 +532,10 @@ def main() -> int:
         msg = f"FATAL: {exc}"
         report_path.write_text(msg + "\n", encoding="utf-8")
         log(msg)
-        log_path.write_text("\n".join(log_lines) + "\n", encoding="utf-8")
+        log_path.write_text(render_log(), encoding="utf-8")
         return 2
 
-    created_users: dict[str, dict[str, str]] = {}
+    created_users: dict[str, CreatedUser] = {}
     role_tokens: dict[str, str] = {"superadmin": access_token}
 
     def create_user(role: str) -> tuple[str, str, str]:
@@ -381,13 +550,13 @@ def main() -> int:
             "role": role,
         }
         resu = curl_json(base_url=base_url, method="POST", path="/admin/users", bearer=access_token, json_body=body)
-        log(f"create_user role={role} status={resu.status_code} body={response_snippet(resu.body_text)}")
+        log(f"create_user role={role} status={resu.status_code} body={response_snippet(resu.body_text, resu.body_json)}")
         if resu.status_code != 201 or not isinstance(resu.body_json, dict):
-            raise RuntimeError(f"create_user failed role={role}: status={resu.status_code} body={response_snippet(resu.body_text)}")
+            raise RuntimeError(f"create_user failed role={role}: status={resu.status_code} body={response_snippet(resu.body_text, resu.body_json)}")
         uid = str(resu.body_json.get("id") or "")
         if not uid:
             raise RuntimeError(f"create_user missing id role={role}")
-        created_users[role] = {"id": uid, "email": user_email}
+        created_users[role] = CreatedUser(id=uid, email=user_email)
         return uid, user_email, user_password
 
     def delete_user(user_id: str) -> None:
@@ -396,7 +565,7 @@ def main() -> int:
             if resd.status_code in (204, 404):
                 log(f"cleanup delete user_id={user_id} status={resd.status_code}")
             else:
-                log(f"WARN: cleanup delete user_id={user_id} status={resd.status_code} body={response_snippet(resd.body_text)}")
+                log(f"WARN: cleanup delete user_id={user_id} status={resd.status_code} body={response_snippet(resd.body_text, resd.body_json)}")
         except Exception as exc:
             log(f"WARN: cleanup delete user_id={user_id} failed: {exc}")
 
@@ -406,7 +575,7 @@ def main() -> int:
             log(f"created_user role={role} email={u_email} password_len={len(u_password)}")
             lr = login(login_email=u_email, login_password=u_password)
             if lr.status_code != 200 or not isinstance(lr.body_json, dict):
-                raise RuntimeError(f"login failed role={role}: status={lr.status_code} body={response_snippet(lr.body_text)}")
+                raise RuntimeError(f"login failed role={role}: status={lr.status_code} body={response_snippet(lr.body_text, lr.body_json)}")
             token = str(lr.body_json.get("accessToken") or "")
             if not token:
                 raise RuntimeError(f"login response missing accessToken role={role}")
@@ -426,13 +595,30 @@ def main() -> int:
         results: list[CaseResult] = []
         mismatches: list[CaseResult] = []
 
-        for role in ("superadmin", "admin", "manager", "cashier"):
-            bearer = role_tokens.get(role)
-            if not bearer:
+        roles = ("superadmin", "admin", "manager", "cashier")
+        for role in roles:
+            if not role_tokens.get(role):
                 raise RuntimeError(f"missing token for role={role}")
-            for method, path, _name, exp_superadmin in cases:
-                expected = exp_superadmin if role == "superadmin" else (200 if path == "/auth/me" else 403)
-                rr = curl_json(base_url=base_url, method=method, path=path, bearer=bearer)
+        # Flat (role, method, path, expected, bearer) plan in matrix order.
+        tasks: list[tuple[str, str, str, int, str]] = [
+            (
+                role,
+                method,
+                path,
+                exp_superadmin if role == "superadmin" else (200 if path == "/auth/me" else 403),
+                role_tokens[role],
+            )
+            for role in roles
+            for method, path, _name, exp_superadmin in cases
+        ]
+
+        def run_case(task: tuple[str, str, str, int, str]) -> CurlResult:
+            _role, method, path, _expected, bearer = task
+            return curl_json(base_url=base_url, method=method, path=path, bearer=bearer)
+
+        # The cases are independent reads; fire them concurrently and record them in matrix order.
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for (role, method, path, expected, _bearer), rr in zip(tasks, pool.map(run_case, tasks)):
                 ok = rr.status_code == expected
                 note_parts: list[str] = []
                 if expected == 403:
@@ -440,10 +626,11 @@ def main() -> int:
                     if not shape_ok:
                         note_parts.append("403 body missing {code,message}")
                         ok = False
-                snip = response_snippet(rr.body_text)
+                snip = response_snippet(rr.body_text, rr.body_json)
                 if snip:
                     note_parts.append(snip)
-                note = " | ".join(note_parts)
+                # The only response-derived report text, so it is redacted here instead of over the whole report.
+                note = redact_text(" | ".join(note_parts))
                 r = CaseResult(
                     role=role,
                     method=method,
@@ -460,9 +647,8 @@ def main() -> int:
 
     finally:
         for info in list(created_users.values()):
-            uid = info.get("id") or ""
-            if uid:
-                delete_user(uid)
+            if info.id:
+                delete_user(info.id)
 
     pass_count = sum(1 for r in results if r.passed)
     fail_count = sum(1 for r in results if not r.passed)
@@ -471,9 +657,9 @@ def main() -> int:
 
     report_lines: list[str] = []
     report_lines.append("# Gateway Zero RBAC 边界业务测试（自动化）\n")
-    report_lines.append(f"- time_utc: `{run_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}`\n")
+    report_lines.append(f"- time_utc: `{run_dt_iso}`\n")
     report_lines.append(f"- git_sha: `{git_sha_short()}`\n")
-    report_lines.append(f"- base_url: `{base_url}`\n")
+    report_lines.append(f"- base_url: `{redact_text(base_url)}`\n")
     report_lines.append("- 约定（RBAC v1）：仅 `superadmin` 可访问 `/admin/*` 与 `/providers/*`；登录用户可访问 `GET /auth/me`\n")
     if bootstrap_fallback_used:
         report_lines.append(
@@ -503,9 +689,7 @@ def main() -> int:
         report_lines.append("- 不一致清单：无\n")
 
     report_text = "".join(report_lines)
-    report_text = redact_text(report_text)
-    log_text = "\n".join(log_lines) + "\n"
-    log_text = redact_text(log_text)
+    log_text = render_log()
 
     try:
         assert_no_secret_leak(report_text, where=str(report_path))
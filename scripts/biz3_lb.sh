@@ -11,6 +11,7 @@ cd "$ROOT_DIR"
 
 PYTHON_BIN="${PYTHON_BIN:-python3}"
 VENV_DIR="scripts/_biz/.venv"
+REQ_FILE="scripts/_biz/requirements.txt"
 RUNNER="scripts/_biz/run_lb.py"
 
 mkdir -p scripts/_biz
@@ -20,6 +21,7 @@ if [[ ! -x "${VENV_DIR}/bin/python" ]]; then
 fi
 
 "${VENV_DIR}/bin/python" -m pip -q install --upgrade pip >/dev/null
+"${VENV_DIR}/bin/pip" -q install -r "$REQ_FILE" >/dev/null
 
 exec "${VENV_DIR}/bin/python" "$RUNNER"
 